@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+# Measures memory used by each SpritesheetNode. Python-side memory is measured
+# with tracemalloc, while total one (including panda3d's own allocations of
+# node, its transform and render state) is taken from process' RSS - thus its
+# only accurate on big amounts of nodes and only works on linux.
+#
+# Usage:
+#   python benchmarks/node_memory.py --count 10000
+
+from os.path import abspath, dirname, join
+import sys
+
+sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+from panda3d.core import load_prc_file_data, NodePath
+import argparse
+import gc
+import os
+import tracemalloc
+
+
+def get_rss() -> int:
+    """Get resident set size of current process, in bytes"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory used per node")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument(
+        "--shared-items",
+        action="store_true",
+        help="Pass shared items table to nodes, instead of calling add_item()",
+    )
+    args = parser.parse_args()
+
+    load_prc_file_data(
+        "", "window-type none\naudio-library-name null\nnotify-level-device fatal"
+    )
+    from direct.showbase.ShowBase import ShowBase
+
+    ShowBase()
+
+    import p3dss
+    import synthetic
+
+    sheet = synthetic.make_sheet(8, 8, (32, 32))
+    items = [
+        p3dss.SpritesheetItem(f"item_{num}", tuple(range(num, num + 8)), loop=True)
+        for num in range(8)
+    ]
+    item_table = {item.name: item for item in items}
+    scheduler = p3dss.AnimationScheduler()
+    root = NodePath("root")
+
+    def make_node():
+        if args.shared_items:
+            return p3dss.SpritesheetNode(
+                sheet, (32, 32), parent=root, scheduler=scheduler, items=item_table
+            )
+
+        node = p3dss.SpritesheetNode(sheet, (32, 32), parent=root, scheduler=scheduler)
+        for item in items:
+            node.add_item(item)
+        return node
+
+    # Warming up caches, so they wont be counted as part of nodes
+    make_node().destroy()
+    gc.collect()
+
+    # Measuring total memory first, since tracemalloc has its own overhead
+    rss = get_rss()
+    nodes = [make_node() for _ in range(args.count)]
+    gc.collect()
+    total_memory = get_rss() - rss
+
+    # Separate set of nodes, made while tracemalloc is running. First one is
+    # kept alive, so memory of both gets measured with the same amount of nodes
+    tracemalloc.start()
+    traced_nodes = [make_node() for _ in range(args.count)]
+    gc.collect()
+    python_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"Nodes: {len(nodes)}")
+    print(f"Python memory per node: {python_memory / len(traced_nodes):.0f} bytes")
+    print(f"Total memory per node: {total_memory / len(nodes):.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+
+# Benchmarks of p3dss hot paths. Runs headless, on synthetic spritesheets.
+#
+# Usage:
+#   python benchmarks/run.py --output results.json
+#   python benchmarks/run.py --compare results.json --threshold 0.2
+#
+# Each case reports median time per operation and peak amount of memory
+# allocated by python during single operation (panda3d's own allocations are
+# not tracked). With --compare, script exits with code 1 if any case became
+# slower than in provided results file by more than threshold (0.2 = 20%)
+
+from os.path import abspath, dirname, join
+import sys
+
+# Benchmarking working tree, rather than installed version of library
+sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+from panda3d.core import load_prc_file_data
+import argparse
+import importlib.util
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+
+log = logging.getLogger()
+
+SPRITE_SIZE = (32, 32)
+NODE_COUNTS = (1, 100, 1000, 10000)
+
+# name: function that returns (operation, amount of items it processes)
+CASES = {}
+
+
+def case(name: str):
+    def wrapper(func):
+        CASES[name] = func
+        return func
+
+    return wrapper
+
+
+def setup_panda(window_type: str):
+    load_prc_file_data(
+        "",
+        f"window-type {window_type}\n"
+        "audio-library-name null\n"
+        "notify-level-device fatal\n"
+        "textures-power-2 none\n",
+    )
+    from direct.showbase.ShowBase import ShowBase
+
+    return ShowBase()
+
+
+def measure(operation, repeat: int, min_time: float = 0.2) -> dict:
+    """Time provided operation. Its called in batches, sized to take at least
+    min_time seconds, and median of repeat batches is reported"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        timings.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time_per_op": statistics.median(timings),
+        "min_time_per_op": min(timings),
+        "peak_memory": peak,
+    }
+
+
+@case("get_offsets 16x16")
+def bench_get_offsets():
+    from p3dss import processor
+    import synthetic
+
+    sheet = synthetic.make_sheet(16, 16, SPRITE_SIZE)
+    return lambda: processor.get_offsets(sheet, SPRITE_SIZE, use_cache=False)
+
+
+@case("get_offsets 16x16 cached")
+def bench_get_offsets_cached():
+    from p3dss import processor
+    import synthetic
+
+    sheet = synthetic.make_sheet(16, 16, SPRITE_SIZE)
+    return lambda: processor.get_offsets(sheet, SPRITE_SIZE)
+
+
+@case("get_offsets 64x64")
+def bench_get_offsets_big():
+    from p3dss import processor
+    import synthetic
+
+    sheet = synthetic.make_sheet(64, 64, (8, 8))
+    return lambda: processor.get_offsets(sheet, (8, 8), use_cache=False)
+
+
+@case("get_images 16x16")
+def bench_get_images():
+    from p3dss import processor
+    import synthetic
+
+    sheet = synthetic.make_sheet(16, 16, SPRITE_SIZE)
+    return lambda: processor.get_images(sheet, SPRITE_SIZE)
+
+
+@case("get_images 64x64")
+def bench_get_images_big():
+    from p3dss import processor
+    import synthetic
+
+    sheet = synthetic.make_sheet(64, 64, (8, 8))
+    return lambda: processor.get_images(sheet, (8, 8))
+
+
+@case("get_textures 16x16")
+def bench_get_textures():
+    from p3dss import processor
+    import synthetic
+
+    sheet = synthetic.make_sheet(16, 16, SPRITE_SIZE)
+    return lambda: processor.get_textures(sheet, SPRITE_SIZE)
+
+
+@case("SpritesheetNode construction")
+def bench_node_construction():
+    from panda3d.core import NodePath
+    import p3dss
+    import synthetic
+
+    sheet = synthetic.make_sheet(4, 4, SPRITE_SIZE)
+    scheduler = p3dss.AnimationScheduler()
+    root = NodePath("root")
+
+    def operation():
+        node = p3dss.SpritesheetNode(
+            sheet, SPRITE_SIZE, parent=root, scheduler=scheduler
+        )
+        node.destroy()
+
+    return operation
+
+
+@case("SpritesheetNode 1000 nodes")
+def bench_node_bulk():
+    from panda3d.core import NodePath
+    import p3dss
+    import synthetic
+
+    sheet = synthetic.make_sheet(4, 4, SPRITE_SIZE)
+    scheduler = p3dss.AnimationScheduler()
+    root = NodePath("root")
+
+    def operation():
+        nodes = [
+            p3dss.SpritesheetNode(sheet, SPRITE_SIZE, parent=root, scheduler=scheduler)
+            for _ in range(1000)
+        ]
+        for node in nodes:
+            node.destroy()
+
+    return operation
+
+
+@case("SpritesheetNode.bulk_create 1000 nodes")
+def bench_node_bulk_create():
+    from panda3d.core import NodePath
+    import p3dss
+    import synthetic
+
+    sheet = synthetic.make_sheet(4, 4, SPRITE_SIZE)
+    scheduler = p3dss.AnimationScheduler()
+    root = NodePath("root")
+
+    def operation():
+        nodes = p3dss.SpritesheetNode.bulk_create(
+            sheet, SPRITE_SIZE, 1000, parent=root, scheduler=scheduler
+        )
+        for node in nodes:
+            node.destroy()
+
+    return operation
+
+
+@case("SpritesheetTilemap 256x256 tiles")
+def bench_tilemap():
+    from panda3d.core import NodePath
+    import p3dss
+    import synthetic
+
+    sheet = synthetic.make_sheet(4, 4, SPRITE_SIZE)
+    rng = random.Random(0)
+    tiles = [[rng.randrange(16) for _ in range(256)] for _ in range(256)]
+    root = NodePath("root")
+
+    def operation():
+        p3dss.SpritesheetTilemap(sheet, SPRITE_SIZE, tiles, parent=root).destroy()
+
+    return operation
+
+
+@case("SpritesheetTilemap.set_tile 1000 tiles")
+def bench_tilemap_set_tile():
+    from panda3d.core import NodePath
+    import p3dss
+    import synthetic
+
+    sheet = synthetic.make_sheet(4, 4, SPRITE_SIZE)
+    tiles = [[0] * 256 for _ in range(256)]
+    tilemap = p3dss.SpritesheetTilemap(sheet, SPRITE_SIZE, tiles, parent=NodePath())
+    rng = random.Random(0)
+    changes = [
+        (rng.randrange(256), rng.randrange(256), rng.randrange(16)) for _ in range(1000)
+    ]
+
+    def operation():
+        for column, row, sprite in changes:
+            tilemap.set_tile(column, row, sprite)
+
+    return operation
+
+
+def make_tick_case(scheduler_class, count: int):
+    def setup():
+        from panda3d.core import NodePath
+        import p3dss
+        import synthetic
+
+        rng = random.Random(0)
+        sheet = synthetic.make_sheet(4, 4, SPRITE_SIZE)
+        scheduler = scheduler_class()
+        root = NodePath("root")
+        items = [
+            p3dss.SpritesheetItem(
+                name=str(num),
+                sprites=tuple(rng.randrange(16) for _ in range(4)),
+                playback_speed=rng.choice((0.05, 0.1, 0.2)),
+                loop=True,
+            )
+            for num in range(8)
+        ]
+        nodes = []
+        for _ in range(count):
+            node = p3dss.SpritesheetNode(
+                sheet, SPRITE_SIZE, parent=root, scheduler=scheduler
+            )
+            for item in items:
+                node.add_item(item)
+            node.play(rng.choice(items).name)
+            nodes.append(node)
+
+        # Scattering nodes across their animations, so not all of them change
+        # frame on the same tick
+        for _ in range(rng.randrange(60)):
+            scheduler.update(1 / 60)
+
+        # Keeping nodes alive for as long as operation exists
+        operation = lambda: scheduler.update(1 / 60)
+        operation.nodes = nodes
+        return operation
+
+    return setup
+
+
+def register_tick_cases():
+    import p3dss
+
+    schedulers = [("AnimationScheduler", p3dss.AnimationScheduler)]
+    if importlib.util.find_spec("numpy") is not None:
+        schedulers.append(("VectorizedScheduler", p3dss.VectorizedScheduler))
+    else:
+        log.info("numpy is not installed, skipping VectorizedScheduler cases")
+
+    for name, scheduler_class in schedulers:
+        for count in NODE_COUNTS:
+            CASES[f"{name} tick {count} nodes"] = make_tick_case(scheduler_class, count)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Get list of cases that regressed compared to baseline"""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        change = result["time_per_op"] / old["time_per_op"] - 1
+        status = "REGRESSION" if change > threshold else "ok"
+        print(f"{name:<45} {change:+8.1%} {status}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run p3dss benchmarks")
+    parser.add_argument("--output", help="Save results to provided json file")
+    parser.add_argument("--compare", help="Compare results with provided json file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown compared to --compare results (default: 0.2)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--filter", default="", help="Only run cases with provided substring"
+    )
+    parser.add_argument("--window-type", default="none", choices=("none", "offscreen"))
+    args = parser.parse_args()
+
+    setup_panda(args.window_type)
+    register_tick_cases()
+
+    results = {}
+    for name, setup in CASES.items():
+        if args.filter not in name:
+            continue
+        result = measure(setup(), args.repeat)
+        results[name] = result
+        print(
+            f"{name:<45} {result['time_per_op'] * 1e6:12.2f} us/op "
+            f"{result['peak_memory'] / 1024:10.1f} KiB"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(
+                f"{len(regressions)} cases regressed by more than {args.threshold:.0%}"
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
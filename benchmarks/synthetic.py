@@ -0,0 +1,44 @@
+# Generators of synthetic spritesheets, used by benchmarks. These dont rely on
+# any files on disk, thus results are reproducible on any machine
+
+from panda3d.core import PNMImage, Texture
+import random
+
+
+def make_sheet_image(
+    columns: int, rows: int, sprite_sizes: tuple, seed: int = 0
+) -> PNMImage:
+    """Make RGBA image with provided amount of sprites. Each sprite is a filled
+    rectangle of random color and size on transparent background, thus sprites
+    differ from each other and have transparent borders of various widths"""
+    rng = random.Random(seed)
+    sprite_x, sprite_y = sprite_sizes
+    image = PNMImage(columns * sprite_x, rows * sprite_y, 4)
+    image.fill(0, 0, 0)
+    image.alpha_fill(0)
+
+    for row in range(rows):
+        for column in range(columns):
+            width = rng.randint(1, sprite_x)
+            height = rng.randint(1, sprite_y)
+            x = column * sprite_x + rng.randint(0, sprite_x - width)
+            y = row * sprite_y + rng.randint(0, sprite_y - height)
+            color = (rng.random(), rng.random(), rng.random())
+            sprite = PNMImage(width, height, 4)
+            sprite.fill(*color)
+            sprite.alpha_fill(1)
+            image.copy_sub_image(sprite, x, y)
+
+    return image
+
+
+def make_sheet(
+    columns: int, rows: int, sprite_sizes: tuple, seed: int = 0, name: str = None
+) -> Texture:
+    """Make spritesheet texture with provided amount of sprites"""
+    image = make_sheet_image(columns, rows, sprite_sizes, seed)
+    texture = Texture(name or f"synthetic_{columns}x{rows}")
+    texture.load(image)
+    # Textures made out of images dont have this set, but p3dss relies on it
+    texture.set_orig_file_size(image.get_x_size(), image.get_y_size(), 1)
+    return texture
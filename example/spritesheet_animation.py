@@ -103,6 +103,11 @@ class Game(ShowBase):
         base.accept("s", self.bat.play, ["fly_backward"])
         base.accept("a", self.bat.play, ["fly_left"])
         base.accept("space", self.bat.play, ["dead"])
+        # Once you dont need the bat anymore - call destroy(). It stops playback,
+        # removes node from its scheduler and from scene graph. Removing node
+        # with self.bat.node.remove_node() works too, but then node only gets
+        # removed from scheduler on its next sprite change
+        base.accept("escape", self.bat.destroy)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,21 @@
 from .exceptions import *
 from .types import *
+from .animations import *
 from .processor import *
 from .nodes import *
+from .stats import *
+from .scheduler import *
+from .engine import *
+from .lod import *
+from .shaders import *
+from .batch import *
+from .pool import *
+from .bake import *
+from .atlas import *
+from .cache import *
+from .tilemap import *
+from .arrays import *
+from . import aio
 
 import logging
 
@@ -0,0 +1,147 @@
+from . import processor, types
+from .nodes import SpritesheetNode
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from direct.task import Task
+from panda3d.core import Filename, SamplerState, Texture, TexturePool
+from panda3d.core import PNMImage as Image
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+# Coroutines of this module are meant to be awaited from Panda3D's coroutine
+# tasks (e.g the ones added with base.task_mgr.add()). Disk access, decoding and
+# cutting are done by background threads, while main loop keeps running -
+# coroutines only check on them once per frame.
+
+_executor = None
+
+
+def _get_executor() -> Executor:
+    """Get executor, shared by all coroutines that didnt receive one"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(os.cpu_count())
+    return _executor
+
+
+async def _wait(future: Future):
+    """Wait for completion of provided future, without blocking main loop"""
+    while not future.done():
+        await Task.pause(0)
+    return future.result()
+
+
+def _load_texture(path: str) -> Texture:
+    texture = TexturePool.load_texture(Filename.from_os_specific(str(path)))
+    if not texture:
+        raise IOError(f"Could not load texture: {path}")
+    return texture
+
+
+def _store_image(spritesheet: Texture) -> Image:
+    sheet_image = Image()
+    spritesheet.store(sheet_image)
+    return sheet_image
+
+
+def _cut_textures(
+    sheet_image: Image,
+    sprite_sizes: tuple,
+    columns: int,
+    rows: range,
+    name_mask: str,
+    texture_filter: SamplerState,
+    texture_format: types.TextureFormat,
+) -> list:
+    images = processor._cut_rows(sheet_image, sprite_sizes, columns, rows)
+    return processor.to_textures(
+        images,
+        name_mask,
+        sprite_sizes,
+        texture_filter,
+        rows.start * columns,
+        texture_format,
+    )
+
+
+async def load_texture(path: str, executor: Executor = None) -> Texture:
+    """Load texture from provided path in background"""
+    executor = executor or _get_executor()
+    return await _wait(executor.submit(_load_texture, path))
+
+
+async def get_textures(
+    spritesheet,
+    sprite_sizes: tuple,
+    texture_filter: SamplerState = None,
+    executor: Executor = None,
+    bands: int = None,
+    progress: callable = None,
+    texture_format: types.TextureFormat = types.TextureFormat.full,
+) -> list:
+    """Awaitable variant of processor.get_textures(). Spritesheet can be either
+    Texture or path to it.
+
+    Sheet gets cut by row bands, in parallel. If progress callback has been
+    passed, it will be called as progress(done, total) each time band has been
+    processed, from main thread.
+    """
+    executor = executor or _get_executor()
+    if not isinstance(spritesheet, Texture):
+        spritesheet = await load_texture(spritesheet, executor)
+
+    processor._check_cut_sizes(spritesheet, sprite_sizes)
+    if texture_filter is None:
+        texture_filter = spritesheet.get_magfilter()
+
+    sheet_image = await _wait(executor.submit(_store_image, spritesheet))
+
+    columns, rows = processor._get_columns_and_rows(spritesheet, sprite_sizes)
+    band_ranges = processor._split_rows(rows, bands or (os.cpu_count() or 1) * 2)
+    futures = [
+        executor.submit(
+            _cut_textures,
+            sheet_image,
+            sprite_sizes,
+            columns,
+            band,
+            spritesheet.get_name(),
+            texture_filter,
+            texture_format,
+        )
+        for band in band_ranges
+    ]
+
+    reported = 0
+    while True:
+        finished = sum(1 for future in futures if future.done())
+        if progress and finished != reported:
+            reported = finished
+            progress(finished, len(futures))
+        if finished == len(futures):
+            break
+        await Task.pause(0)
+
+    textures = []
+    for future in futures:
+        textures.extend(future.result())
+
+    return textures
+
+
+async def load_spritesheet_node(
+    path: str,
+    sprite_sizes: tuple,
+    items: list = None,
+    executor: Executor = None,
+    **kwargs,
+) -> SpritesheetNode:
+    """Load spritesheet from provided path in background and make
+    SpritesheetNode out of it. Other keyword arguments are passed to node as is.
+    Node wont be attached to scene graph until texture has been loaded"""
+    spritesheet = await load_texture(path, executor)
+    node = SpritesheetNode(spritesheet=spritesheet, sprite_sizes=sprite_sizes, **kwargs)
+    for item in items or []:
+        node.add_item(item)
+    return node
@@ -0,0 +1,44 @@
+from . import types
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class AnimationSet:
+    """Set of SpritesheetItem objects, meant to be made once and shared by all
+    nodes that play the same animations (e.g all enemies of the same kind).
+
+    Each item receives integer id, in order items have been passed. Nodes can
+    play items by these ids instead of names, and dont need items of their own -
+    they use items table of set by reference. Playing by id takes items from
+    set's entries directly, thus items added to node with add_item() can only
+    be played by their names.
+    """
+
+    def __init__(self, items: list, default_item: str = None):
+        # Items in order of their ids, used by nodes as is on play() with id
+        self.entries = tuple(items)
+        self.names = tuple(item.name for item in self.entries)
+        self.ids = {name: num for num, name in enumerate(self.names)}
+        if len(self.ids) != len(self.names):
+            raise ValueError("Items of AnimationSet must have unique names")
+        # Items table used by nodes of this set. Dont modify it in place
+        self.items = {item.name: item for item in self.entries}
+        self.default_item = default_item
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, item) -> bool:
+        if isinstance(item, int):
+            return 0 <= item < len(self.entries)
+        return item in self.items
+
+    def get_id(self, name: str) -> int:
+        """Get id of item with provided name. Meant to be done once, with result
+        being stored to be passed to play() later"""
+        return self.ids[name]
+
+    def get_item(self, item_id: int) -> types.SpritesheetItem:
+        """Get item with provided id"""
+        return self.entries[item_id]
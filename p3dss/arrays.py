@@ -0,0 +1,121 @@
+from . import exceptions, processor
+from panda3d.core import Texture, SamplerState
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+log = logging.getLogger(__name__)
+
+
+def _get_dtype(texture: Texture):
+    dtypes = {
+        Texture.T_unsigned_byte: np.uint8,
+        Texture.T_unsigned_short: np.uint16,
+        Texture.T_float: np.float32,
+    }
+    dtype = dtypes.get(texture.get_component_type())
+    if dtype is None:
+        raise ValueError(
+            f"{texture.get_name()} has unsupported component type "
+            f"{texture.get_component_type()}"
+        )
+    return dtype
+
+
+def get_pixel_array(spritesheet: Texture):
+    """Get pixels of provided texture's RAM image as numpy array of shape
+    (height, width, channels), without copying them.
+
+    Rows are ordered from top to bottom, same as in PNMImage (this is done with
+    negative stride, not by copying). Keep in mind that channels are stored in
+    Panda3D's own order, which is BGR(A), and that array is read-only.
+    If RAM image is compressed, uncompressed copy of it will be made.
+    """
+    if np is None:
+        raise exceptions.MissingDependency("numpy", "get_pixel_array()")
+
+    if spritesheet.get_ram_image_compression() == Texture.CM_off:
+        ram_image = spritesheet.get_ram_image()
+    else:
+        ram_image = spritesheet.get_uncompressed_ram_image()
+
+    shape = (
+        spritesheet.get_y_size(),
+        spritesheet.get_x_size(),
+        spritesheet.get_num_components(),
+    )
+    pixels = np.frombuffer(ram_image, dtype=_get_dtype(spritesheet))
+    pixels = pixels.reshape(shape)
+    return pixels[::-1]
+
+
+def get_sprite_grid(spritesheet: Texture, sprite_sizes: tuple):
+    """Get view of spritesheet's pixels, shaped as (rows, columns, sprite_y,
+    sprite_x, channels). Useful to analyze all sprites at once"""
+    processor._check_cut_sizes(spritesheet, sprite_sizes)
+    sprite_x, sprite_y = sprite_sizes
+    pixels = get_pixel_array(spritesheet)
+    height, width, channels = pixels.shape
+    return pixels.reshape(
+        height // sprite_y, sprite_y, width // sprite_x, sprite_x, channels
+    ).swapaxes(1, 2)
+
+
+def get_sprite_views(spritesheet: Texture, sprite_sizes: tuple) -> list:
+    """Get view of each sprite on spritesheet. Views are ordered the same way as
+    images returned by processor.get_images(), and share memory with texture"""
+    grid = get_sprite_grid(spritesheet, sprite_sizes)
+    return [sprite for row in grid for sprite in row]
+
+
+def view_to_texture(
+    view,
+    name: str = None,
+    texture_filter: SamplerState = None,
+) -> Texture:
+    """Copy pixels of provided array (in layout returned by get_pixel_array())
+    into new texture"""
+    if np is None:
+        raise exceptions.MissingDependency("numpy", "view_to_texture()")
+
+    height, width, channels = view.shape
+    component_types = {
+        np.dtype(np.uint8): Texture.T_unsigned_byte,
+        np.dtype(np.uint16): Texture.T_unsigned_short,
+        np.dtype(np.float32): Texture.T_float,
+    }
+    formats = {
+        1: Texture.F_luminance,
+        2: Texture.F_luminance_alpha,
+        3: Texture.F_rgb,
+        4: Texture.F_rgba,
+    }
+
+    texture = Texture(name or "sprite")
+    texture.setup_2d_texture(
+        width, height, component_types[view.dtype], formats[channels]
+    )
+    # Flipping rows back, since RAM images are stored from bottom to top
+    texture.set_ram_image(np.ascontiguousarray(view[::-1]))
+    if texture_filter is not None:
+        texture.set_magfilter(texture_filter)
+        texture.set_minfilter(texture_filter)
+    texture.set_orig_file_size(width, height, 1)
+    return texture
+
+
+def views_to_textures(
+    views: list,
+    name_mask: str = None,
+    texture_filter: SamplerState = None,
+) -> list:
+    """Convert provided list of arrays into Texture objects. Counterpart of
+    processor.to_textures() for views returned by get_sprite_views()"""
+    name_mask = name_mask or "sprite"
+    return [
+        view_to_texture(view, f"{name_mask}_{num}", texture_filter)
+        for num, view in enumerate(views)
+    ]
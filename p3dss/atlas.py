@@ -0,0 +1,273 @@
+from . import types, exceptions, processor
+from collections import namedtuple
+from panda3d.core import Texture, SamplerState, Filename, LPoint2
+from panda3d.core import PNMImage as Image
+import logging
+
+log = logging.getLogger(__name__)
+
+# Position of sprite on atlas page, in pixels. x and y are coordinates of its
+# top left corner, same as in PNMImage
+AtlasRect = namedtuple("AtlasRect", ["page", "x", "y", "width", "height"])
+
+
+def _contains(outer: tuple, inner: tuple) -> bool:
+    return (
+        inner[0] >= outer[0]
+        and inner[1] >= outer[1]
+        and inner[0] + inner[2] <= outer[0] + outer[2]
+        and inner[1] + inner[3] <= outer[1] + outer[3]
+    )
+
+
+class _MaxRectsPage:
+    """Single atlas page, packed with MaxRects "best short side fit" heuristic"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        # Free areas of page as (x, y, width, height). These may overlap
+        self.free = [(0, 0, width, height)]
+        # Size of area, actually occupied by sprites
+        self.used_width = 0
+        self.used_height = 0
+
+    def insert(self, width: int, height: int) -> tuple:
+        """Find place for rectangle of provided size. Returns its (x, y), or None
+        if it doesnt fit"""
+        best = None
+        best_score = None
+        for free_x, free_y, free_width, free_height in self.free:
+            if width > free_width or height > free_height:
+                continue
+            leftover_x = free_width - width
+            leftover_y = free_height - height
+            score = (min(leftover_x, leftover_y), max(leftover_x, leftover_y))
+            if best is None or score < best_score:
+                best = (free_x, free_y)
+                best_score = score
+
+        if best is None:
+            return None
+
+        self._split(best[0], best[1], width, height)
+        self.used_width = max(self.used_width, best[0] + width)
+        self.used_height = max(self.used_height, best[1] + height)
+        return best
+
+    def _split(self, x: int, y: int, width: int, height: int):
+        """Cut placed rectangle out of free areas"""
+        areas = []
+        for free in self.free:
+            free_x, free_y, free_width, free_height = free
+            if (
+                x >= free_x + free_width
+                or x + width <= free_x
+                or y >= free_y + free_height
+                or y + height <= free_y
+            ):
+                areas.append(free)
+                continue
+
+            if x > free_x:
+                areas.append((free_x, free_y, x - free_x, free_height))
+            if x + width < free_x + free_width:
+                areas.append(
+                    (x + width, free_y, free_x + free_width - x - width, free_height)
+                )
+            if y > free_y:
+                areas.append((free_x, free_y, free_width, y - free_y))
+            if y + height < free_y + free_height:
+                areas.append(
+                    (free_x, y + height, free_width, free_y + free_height - y - height)
+                )
+
+        # Removing duplicates and areas that are fully covered by other ones
+        areas = list(dict.fromkeys(areas))
+        self.free = [
+            area
+            for area in areas
+            if not any(other != area and _contains(other, area) for other in areas)
+        ]
+
+
+class Atlas:
+    """Set of sprites, packed into one or few power-of-two textures"""
+
+    def __init__(
+        self, pages: list, rects: list, names: list = None, frames: list = None
+    ):
+        # Textures of atlas pages
+        self.pages = pages
+        # AtlasRect of each sprite, in order they have been passed to packer
+        self.rects = rects
+        # If sprites have been trimmed - (left, right, bottom, top) part of
+        # original image, covered by each of them
+        self.frames = frames
+        self.names = names or []
+        self.indexes = {name: num for num, name in enumerate(self.names)}
+
+    def get_uv_rect(self, sprite: int) -> tuple:
+        """Get (u, v, width, height) of sprite on its page, in 0-1 range"""
+        rect = self.rects[sprite]
+        page = self.pages[rect.page]
+        page_x = page.get_x_size()
+        page_y = page.get_y_size()
+        return (
+            rect.x / page_x,
+            # Textures count v from bottom, unlike images
+            (page_y - rect.y - rect.height) / page_y,
+            rect.width / page_x,
+            rect.height / page_y,
+        )
+
+    def get_sprite_data(self, page: int = 0) -> types.SpritesheetData:
+        """Get SpritesheetData of provided page, that can be used by
+        SpritesheetNode. Sprites are numbered in the same order as atlas' rects,
+        but only sprites located on this page will be valid"""
+        offsets = []
+        scales = []
+        for num, rect in enumerate(self.rects):
+            u, v, width, height = self.get_uv_rect(num)
+            if rect.page != page:
+                u = v = width = height = 0
+            offsets.append(LPoint2(u, v))
+            scales.append(LPoint2(width, height))
+
+        texture = self.pages[page]
+        return types.SpritesheetData(
+            texture,
+            tuple(offsets),
+            scales[0] if scales else None,
+            tuple(scales),
+            tuple(self.frames) if self.frames else None,
+        )
+
+
+def _load_image(image) -> Image:
+    """Get PNMImage with alpha channel out of provided image or path"""
+    if not isinstance(image, Image):
+        path = image
+        image = Image()
+        if not image.read(Filename.from_os_specific(str(path))):
+            raise FileNotFoundError(f"Unable to read image from {path}")
+
+    if not image.has_alpha():
+        image = Image(image)
+        image.add_alpha()
+        image.alpha_fill(1)
+
+    return image
+
+
+def _trim_image(image: Image, alpha_threshold: int) -> tuple:
+    """Cut transparent borders of provided image. Returns trimmed image and
+    (left, right, bottom, top) part of original image, covered by it"""
+    texture = Texture()
+    texture.load(image)
+    width = image.get_x_size()
+    height = image.get_y_size()
+    rect = processor._find_trim_rect(
+        processor._get_alpha_mask(texture, alpha_threshold),
+        (texture.get_x_size(), texture.get_y_size()),
+        0,
+        0,
+        width,
+        height,
+    )
+
+    trimmed = Image(rect.width, rect.height, image.get_num_channels())
+    if rect.width and rect.height:
+        trimmed.copy_sub_image(image, 0, 0, rect.x, rect.y, rect.width, rect.height)
+    frame = (
+        rect.x / width,
+        (rect.x + rect.width) / width,
+        1 - (rect.y + rect.height) / height,
+        1 - rect.y / height,
+    )
+    return trimmed, frame
+
+
+def build_atlas(
+    images: list,
+    names: list = None,
+    max_page_size: int = 2048,
+    padding: int = 1,
+    name: str = None,
+    texture_filter: SamplerState = None,
+    trim: bool = False,
+    alpha_threshold: int = 0,
+) -> Atlas:
+    """Pack provided PNMImage objects (or paths to image files) into atlas.
+
+    Sprites are placed with MaxRects algorithm onto square pages of up to
+    max_page_size pixels, with padding pixels of empty space between them.
+    Pages get shrunk to the smallest power of two that fits their content.
+    If trim is enabled, transparent borders of sprites are cut before packing,
+    and atlas receives frames to place them correctly on node's card.
+    """
+    name = name or "atlas"
+    images = [_load_image(image) for image in images]
+    frames = None
+    if trim:
+        images, frames = zip(*(_trim_image(image, alpha_threshold) for image in images))
+        images = list(images)
+        frames = list(frames)
+
+    # Placing big sprites first gives much denser results
+    order = sorted(
+        range(len(images)),
+        key=lambda num: (
+            max(images[num].get_x_size(), images[num].get_y_size()),
+            images[num].get_x_size() * images[num].get_y_size(),
+        ),
+        reverse=True,
+    )
+
+    pages = []
+    rects = [None] * len(images)
+    for num in order:
+        width = images[num].get_x_size()
+        height = images[num].get_y_size()
+        if not width or not height:
+            # Fully transparent trimmed sprite, there is nothing to pack
+            rects[num] = AtlasRect(0, 0, 0, 0, 0)
+            continue
+        if width + padding > max_page_size or height + padding > max_page_size:
+            raise exceptions.SpriteTooBig(num, (width, height), max_page_size)
+
+        for page_num, page in enumerate(pages):
+            position = page.insert(width + padding, height + padding)
+            if position:
+                break
+        else:
+            page_num = len(pages)
+            page = _MaxRectsPage(max_page_size, max_page_size)
+            pages.append(page)
+            position = page.insert(width + padding, height + padding)
+
+        rects[num] = AtlasRect(page_num, position[0], position[1], width, height)
+
+    log.debug("Packed %s sprites into %s pages", len(images), len(pages))
+
+    textures = []
+    for page_num, page in enumerate(pages):
+        page_image = Image(
+            processor._next_power_of_two(page.used_width),
+            processor._next_power_of_two(page.used_height),
+            4,
+        )
+        for num, rect in enumerate(rects):
+            if rect.page == page_num and rect.width:
+                page_image.copy_sub_image(images[num], rect.x, rect.y)
+
+        texture = Texture(f"{name}_{page_num}")
+        texture.load(page_image)
+        if texture_filter is not None:
+            texture.set_magfilter(texture_filter)
+            texture.set_minfilter(texture_filter)
+        texture.set_wrap_u(Texture.WM_clamp)
+        texture.set_wrap_v(Texture.WM_clamp)
+        textures.append(texture)
+
+    return Atlas(textures, rects, names, frames)
@@ -0,0 +1,120 @@
+import logging
+from panda3d.core import NodePath
+from . import types
+
+log = logging.getLogger(__name__)
+
+
+class StaticSpriteGroup:
+    """Group of SpritesheetNode objects, baked into as few geoms as possible.
+
+    Meant for static decorations (tiles, props, single-frame items). Copies of
+    nodes get flattened with flatten_strong(), which writes their sprites' UVs
+    directly into vertex data, thus nodes of the same spritesheet end up as
+    single geom and draw call. Original nodes are stashed while baked.
+
+    Only stopped, paused or single-frame nodes can be baked - others are left
+    as is. Shader mode nodes are skipped too, since their UVs are calculated by
+    shader. Once baked node starts to play something or gets destroyed, its
+    removed from group and the rest of group is baked again - this is as slow
+    as initial bake, thus dont bake nodes that change often. Keep in mind that
+    sprites changed via show_sprite() wont be visible till node leaves group.
+    """
+
+    def __init__(self, nodes: list, parent: NodePath = None, name: str = None):
+        self.name = name or "p3dss static sprites"
+        # Baked nodes. Ordered, so rebakes keep the same order of geometry
+        self.nodes = {}
+        # Node that holds baked geometry
+        self.root = None
+        # Node, relatively to which baked geometry is placed
+        self.parent = parent
+
+        for node in nodes:
+            if self._can_bake(node):
+                self.nodes[node] = None
+            else:
+                log.debug("%s cant be baked, skipping it", node.name)
+
+        if self.parent is None and self.nodes:
+            self.parent = next(iter(self.nodes)).node.get_parent()
+
+        self.bake()
+
+    @staticmethod
+    def _can_bake(node) -> bool:
+        if node.use_shader or node.bake_group is not None:
+            return False
+        item = node.active_item
+        if item is None:
+            return True
+        # Items that would reset to default one change after all. Paused nodes
+        # may still wait for that reset
+        if (
+            item.reset_on_complete
+            and node.default_item
+            and node.default_item != node.current_item
+        ):
+            return False
+        if node.playing == types.PlaybackState.play:
+            return len(item.sprites) == 1
+        return True
+
+    def _copy_node(self, node):
+        """Copy node's geometry under self.root, with its transform and state
+        relative to self.parent"""
+        if node.frames:
+            left, right, bottom, top = node.frames[node.current_sprite]
+            if right <= left or top <= bottom:
+                # Sprite is fully transparent, there is nothing to draw
+                return
+
+        copy = node.node.copy_to(self.root)
+        copy.set_transform(node.node.get_transform(self.parent))
+        copy.set_state(node.node.get_state(self.parent))
+        copy.unstash()
+
+    def bake(self):
+        """(Re)build baked geometry of all nodes in group"""
+        if self.root is not None:
+            self.root.remove_node()
+            self.root = None
+        if not self.nodes:
+            return
+
+        self.root = self.parent.attach_new_node(self.name)
+        for node in self.nodes:
+            if node.playing == types.PlaybackState.play:
+                # Playback switches to item's sprite only once its first frame
+                # is over, which wont happen while node is baked
+                node.show_sprite(node.active_item.sprites[0])
+            self._copy_node(node)
+            node.node.stash()
+            node.bake_group = self
+            # Single-frame items wont change anyway, no need to update them
+            node.scheduler.deactivate(node)
+
+        # This applies texture matrices of nodes (thus their current sprites) to
+        # vertices, and merges geoms with the same render state
+        self.root.flatten_strong()
+        log.debug("Baked %s nodes into %s", len(self.nodes), self.name)
+
+    def remove(self, node, rebake: bool = True):
+        """Return provided node to scene, and rebake the rest of group"""
+        if self.nodes.pop(node, False) is not False:
+            self._release(node)
+            if rebake:
+                self.bake()
+
+    def _release(self, node):
+        node.bake_group = None
+        node.node.unstash()
+        if node.playing == types.PlaybackState.play:
+            node.scheduler.activate(node)
+
+    def unbake(self):
+        """Return all nodes to scene and remove baked geometry"""
+        for node in self.nodes:
+            self._release(node)
+        self.nodes = {}
+        self.bake()
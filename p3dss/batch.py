@@ -0,0 +1,308 @@
+import logging
+from array import array
+from panda3d.core import (
+    GeomEnums,
+    NodePath,
+    OmniBoundingVolume,
+    Shader,
+    Texture,
+    Vec3,
+)
+from . import processor, types
+from .nodes import (
+    SpritesheetPlayback,
+    _get_card_frame,
+    _get_card_geom,
+    _make_card,
+    _set_wrap_mode,
+    make_sprite_state,
+)
+from .scheduler import AnimationScheduler
+
+log = logging.getLogger(__name__)
+
+# Amount of floats stored per instance in batch's buffer:
+# position (x, y, z), scale, texture offset (u, v), texture scale (u, v)
+INSTANCE_SIZE = 8
+
+# Each instance reads its placement and sprite from buffer texture, based on
+# its gl_InstanceID. Requires OpenGL 3.1+
+BATCH_VERTEX_SHADER = """#version 140
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform samplerBuffer p3dss_instances;
+
+in vec4 p3d_Vertex;
+in vec2 p3d_MultiTexCoord0;
+
+out vec2 texcoord;
+
+void main() {
+    vec4 placement = texelFetch(p3dss_instances, gl_InstanceID * 2);
+    vec4 sprite = texelFetch(p3dss_instances, gl_InstanceID * 2 + 1);
+    vec3 position = p3d_Vertex.xyz * placement.w + placement.xyz;
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(position, 1);
+    texcoord = p3d_MultiTexCoord0 * sprite.zw + sprite.xy;
+}
+"""
+
+BATCH_FRAGMENT_SHADER = """#version 140
+
+uniform sampler2D p3d_Texture0;
+uniform vec4 p3d_ColorScale;
+
+in vec2 texcoord;
+
+out vec4 p3d_FragColor;
+
+void main() {
+    p3d_FragColor = texture(p3d_Texture0, texcoord) * p3d_ColorScale;
+}
+"""
+
+_batch_shader = None
+
+
+def get_batch_shader() -> Shader:
+    """Get shader used by SpritesheetBatch"""
+    global _batch_shader
+    if _batch_shader is None:
+        _batch_shader = Shader.make(
+            Shader.SL_GLSL, BATCH_VERTEX_SHADER, BATCH_FRAGMENT_SHADER
+        )
+    return _batch_shader
+
+
+class BatchSprite(SpritesheetPlayback):
+    """Lightweight handle of single sprite, drawn as part of SpritesheetBatch.
+    Has the same playback API as SpritesheetNode, but no node of its own"""
+
+    __slots__ = ("batch", "index")
+
+    def __init__(
+        self,
+        batch: "SpritesheetBatch",
+        index: int,
+        name: str,
+        default_sprite: int = 0,
+        scheduler: AnimationScheduler = None,
+    ):
+        self.batch = batch
+        # Number of instance, used to draw this sprite. May change when other
+        # sprites get removed from batch
+        self.index = index
+        super().__init__(
+            name=name,
+            offsets=batch.offsets,
+            default_sprite=default_sprite,
+            scheduler=scheduler,
+        )
+
+    def show_sprite(self, sprite: int):
+        """Switch instance's texture to sprite with provided number"""
+        self.current_sprite = sprite
+        self.batch.set_instance_sprite(self.index, sprite)
+
+    def set_pos(self, *position):
+        """Set position of sprite, relatively to batch's node"""
+        self.batch.set_instance_pos(self.index, Vec3(*position))
+
+    def get_pos(self) -> Vec3:
+        """Get position of sprite, relatively to batch's node"""
+        return self.batch.get_instance_pos(self.index)
+
+    def set_scale(self, scale: float):
+        """Set uniform scale of sprite"""
+        self.batch.set_instance_scale(self.index, scale)
+
+    def destroy(self):
+        """Stop playback and remove sprite from its batch"""
+        super().destroy()
+        self.batch.remove(self)
+
+
+class SpritesheetBatch:
+    """Flat sprites from single spritesheet, drawn as single instanced Geom.
+
+    Placement and shown sprite of each instance are packed into buffer texture,
+    which gets uploaded in bulk once per frame, if anything has changed.
+    Requires hardware instancing and buffer textures support (OpenGL 3.1+).
+    Since all instances share one node, they also share its transform and render
+    state - e.g billboard effects apply to whole batch, not to separate sprites.
+    """
+
+    def __init__(
+        self,
+        spritesheet: Texture,
+        sprite_sizes: tuple,
+        node_sizes: tuple = None,
+        name: str = None,
+        is_two_sided: bool = False,
+        is_transparent: bool = True,
+        parent: NodePath = None,
+        capacity: int = 256,
+        scheduler: AnimationScheduler = None,
+        flush_sort: int = 1,
+        sprite_data: types.SpritesheetData = None,
+    ):
+        parent = parent or NodePath()
+        self.name = name or spritesheet.get_name() or "SpritesheetBatch"
+        self.sprite_sizes = sprite_sizes
+        self.node_sizes = node_sizes or self.sprite_sizes
+        self.scheduler = scheduler
+
+        sprite_data = sprite_data or processor.get_offsets(
+            spritesheet, self.sprite_sizes
+        )
+        if sprite_data.frames:
+            # All instances share one card, which cant be resized per sprite
+            raise ValueError(
+                f"{self.name} cant draw trimmed sprites, use untrimmed sprite data"
+            )
+        self.offsets = sprite_data.offsets
+        self.step_sizes = sprite_data.step_sizes
+        self.scales = sprite_data.scales
+
+        _set_wrap_mode(spritesheet)
+        self.node = _make_card(
+            self.name,
+            _get_card_geom(_get_card_frame(tuple(self.node_sizes))),
+            make_sprite_state(spritesheet, is_two_sided, is_transparent),
+            parent,
+        )
+
+        # Instances can be placed anywhere, thus card's own bounds cant be used
+        # for culling
+        self.node.node().set_bounds(OmniBoundingVolume())
+        self.node.node().set_final(True)
+
+        # Packed per-instance data. Only first self.count instances are drawn
+        self.count = 0
+        self.data = array("f", [0.0]) * (capacity * INSTANCE_SIZE)
+        self.sprites = []
+        self.buffer = Texture(f"{self.name}_instances")
+        self._setup_buffer(capacity)
+
+        self.node.set_shader(get_batch_shader())
+        self.node.set_shader_input("p3dss_instances", self.buffer)
+        self.node.set_instance_count(0)
+        # Instance count of 0 disables instancing, rather than drawing nothing.
+        # Thus empty batch is hidden, or it would draw card of its first slot
+        self.node.hide()
+
+        # If something has changed since last upload
+        self.dirty = False
+        self.task = base.task_mgr.add(
+            self._flush_task, f"Flush task of {self.name}", sort=flush_sort
+        )
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data) // INSTANCE_SIZE
+
+    def _setup_buffer(self, capacity: int):
+        """(Re)allocate buffer texture to fit provided amount of instances"""
+        self.buffer.setup_buffer_texture(
+            capacity * 2,
+            Texture.T_float,
+            Texture.F_rgba32,
+            GeomEnums.UH_dynamic,
+        )
+
+    def add(
+        self,
+        position: Vec3 = None,
+        scale: float = 1.0,
+        default_sprite: int = 0,
+        name: str = None,
+    ) -> BatchSprite:
+        """Add new instance to batch and get handle to control it"""
+        if self.count == self.capacity:
+            self.data.extend(array("f", [0.0]) * len(self.data))
+            self._setup_buffer(self.capacity)
+
+        index = self.count
+        self.count += 1
+        sprite = BatchSprite(
+            batch=self,
+            index=index,
+            name=name or f"{self.name}_{index}",
+            default_sprite=default_sprite,
+            scheduler=self.scheduler,
+        )
+        self.sprites.append(sprite)
+        self.set_instance_pos(index, Vec3(*position) if position else Vec3(0))
+        self.set_instance_scale(index, scale)
+        self.set_instance_sprite(index, default_sprite)
+        return sprite
+
+    def remove(self, sprite: BatchSprite):
+        """Remove instance of provided sprite from batch. Sprite's playback wont
+        be stopped - use sprite.destroy() for that"""
+        index = sprite.index
+        if index >= self.count or self.sprites[index] is not sprite:
+            log.warning("%s doesnt belong to %s", sprite.name, self.name)
+            return
+
+        # Moving last instance into freed place, to keep drawn instances dense
+        last = self.count - 1
+        if index != last:
+            moved = self.sprites[last]
+            start = index * INSTANCE_SIZE
+            last_start = last * INSTANCE_SIZE
+            self.data[start : start + INSTANCE_SIZE] = self.data[
+                last_start : last_start + INSTANCE_SIZE
+            ]
+            moved.index = index
+            self.sprites[index] = moved
+        self.sprites.pop()
+        self.count = last
+        self.dirty = True
+
+    def set_instance_pos(self, index: int, position: Vec3):
+        start = index * INSTANCE_SIZE
+        self.data[start], self.data[start + 1], self.data[start + 2] = position
+        self.dirty = True
+
+    def get_instance_pos(self, index: int) -> Vec3:
+        start = index * INSTANCE_SIZE
+        return Vec3(*self.data[start : start + 3])
+
+    def set_instance_scale(self, index: int, scale: float):
+        self.data[index * INSTANCE_SIZE + 3] = scale
+        self.dirty = True
+
+    def set_instance_sprite(self, index: int, sprite: int):
+        start = index * INSTANCE_SIZE + 4
+        offset = self.offsets[sprite]
+        data = self.data
+        data[start] = offset[0]
+        data[start + 1] = offset[1]
+        scale = self.scales[sprite] if self.scales else self.step_sizes
+        data[start + 2] = scale[0]
+        data[start + 3] = scale[1]
+        self.dirty = True
+
+    def flush(self):
+        """Upload changed instance data to gpu"""
+        if not self.dirty:
+            return
+
+        self.buffer.set_ram_image(memoryview(self.data).cast("B"))
+        self.node.set_instance_count(self.count)
+        if self.count:
+            self.node.show()
+        else:
+            self.node.hide()
+        self.dirty = False
+
+    def _flush_task(self, event):
+        self.flush()
+        return event.cont
+
+    def destroy(self):
+        """Destroy all sprites of this batch and remove its node"""
+        for sprite in tuple(self.sprites):
+            sprite.destroy()
+        self.task.remove()
+        self.node.remove_node()
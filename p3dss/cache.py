@@ -0,0 +1,296 @@
+from . import atlas, processor
+from panda3d.core import Filename, SamplerState, Texture
+import hashlib
+import json
+import logging
+import mmap
+import os
+
+log = logging.getLogger(__name__)
+
+# Version of cache entries layout. Entries with other version are ignored
+CACHE_VERSION = 2
+
+
+class SpriteCache:
+    """On-disk cache of sprites, cut out of spritesheets, and of atlases.
+
+    Each entry is stored as pair of files: raw blob with RAM images of all
+    textures, and json index describing them. Entries are keyed by hash of
+    spritesheet's source file, sprite sizes and texture filter - thus once file
+    has changed, its old entries will be considered stale and replaced.
+    Atlas entries are keyed by hashes of all their source files and arguments
+    of build_atlas(). These arent removed once sources change, but wont be used
+    anymore and will be evicted eventually.
+    If total size of cache exceeds max_size bytes, least recently used entries
+    get removed.
+    """
+
+    def __init__(self, directory: str, max_size: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+        # Known hashes of source files, to avoid rehashing unchanged ones.
+        # Stored as path: [mtime, size, hash]
+        self._sources_path = os.path.join(self.directory, "sources.json")
+        self.sources = self._read_json(self._sources_path) or {}
+
+    @staticmethod
+    def _read_json(path: str) -> dict:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _get_source_hash(self, path: str) -> str:
+        """Get hash of file on provided path. Its only recalculated if file's
+        modification time or size have changed"""
+        stat = os.stat(path)
+        known = self.sources.get(path)
+        if known and known[0] == stat.st_mtime and known[1] == stat.st_size:
+            return known[2]
+
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        file_hash = digest.hexdigest()
+
+        if known:
+            # File has changed, thus entries made out of it are stale
+            self._remove_entries(known[2])
+        self.sources[path] = [stat.st_mtime, stat.st_size, file_hash]
+        with open(self._sources_path, "w") as f:
+            json.dump(self.sources, f)
+
+        return file_hash
+
+    def _get_key(
+        self, file_hash: str, sprite_sizes: tuple, texture_filter: SamplerState
+    ) -> str:
+        return f"{file_hash}_{sprite_sizes[0]}x{sprite_sizes[1]}_{int(texture_filter)}"
+
+    def _get_paths(self, key: str) -> tuple:
+        return (
+            os.path.join(self.directory, f"{key}.json"),
+            os.path.join(self.directory, f"{key}.bin"),
+        )
+
+    def _remove_entries(self, file_hash: str):
+        """Remove all entries made out of file with provided hash"""
+        for filename in os.listdir(self.directory):
+            if filename.startswith(f"{file_hash}_"):
+                os.remove(os.path.join(self.directory, filename))
+
+    def get_textures(
+        self,
+        spritesheet,
+        sprite_sizes: tuple,
+        texture_filter: SamplerState = None,
+    ) -> list:
+        """Same as processor.get_textures(), but tries to load result from cache
+        first, and stores it there on miss. Spritesheet can be either Texture or
+        path to image file - in later case, its only loaded and cut on miss"""
+        if isinstance(spritesheet, Texture):
+            path = spritesheet.get_fullpath().to_os_specific()
+            name = spritesheet.get_name()
+            if texture_filter is None:
+                texture_filter = spritesheet.get_magfilter()
+            if not path or not os.path.isfile(path):
+                log.debug("%s has no source file, wont cache it", name)
+                return processor.get_textures(spritesheet, sprite_sizes, texture_filter)
+        else:
+            path = os.fspath(spritesheet)
+            name = os.path.basename(path)
+            spritesheet = None
+            # Same as filter of freshly loaded texture
+            if texture_filter is None:
+                texture_filter = SamplerState.FT_default
+
+        key = self._get_key(self._get_source_hash(path), sprite_sizes, texture_filter)
+        textures = self.load(key, name, texture_filter)
+        if textures is not None:
+            log.debug("Loaded %s sprites of %s from cache", len(textures), path)
+            return textures
+
+        if spritesheet is None:
+            # Not going through TexturePool, since it may return outdated copy
+            # of changed file, and would keep texture in memory afterwards
+            spritesheet = Texture(name)
+            if not spritesheet.read(Filename.from_os_specific(path)):
+                raise FileNotFoundError(f"Unable to load texture from {path}")
+        textures = processor.get_textures(spritesheet, sprite_sizes, texture_filter)
+        self.store(key, textures, sprite_sizes)
+        return textures
+
+    def get_atlas(self, paths: list, **kwargs) -> atlas.Atlas:
+        """Same as build_atlas(), but tries to load result from cache first, and
+        stores it there on miss. Only accepts paths to image files. Extra
+        arguments are passed to build_atlas()"""
+        paths = [os.fspath(path) for path in paths]
+        texture_filter = kwargs.get("texture_filter")
+        # Filter is enum, which cant be dumped to json as it is
+        arguments = dict(
+            kwargs,
+            texture_filter=None if texture_filter is None else int(texture_filter),
+        )
+        digest = hashlib.sha1(
+            json.dumps(
+                [[self._get_source_hash(path) for path in paths], arguments],
+                sort_keys=True,
+            ).encode()
+        )
+        key = f"atlas_{digest.hexdigest()}"
+        name = kwargs.get("name") or "atlas"
+
+        loaded = self._load_entry(key, name, texture_filter)
+        if loaded is not None:
+            pages, index = loaded
+            for page in pages:
+                page.set_wrap_u(Texture.WM_clamp)
+                page.set_wrap_v(Texture.WM_clamp)
+            log.debug("Loaded atlas of %s sprites from cache", len(paths))
+            return atlas.Atlas(
+                pages,
+                [atlas.AtlasRect(*rect) for rect in index["rects"]],
+                kwargs.get("names"),
+                (
+                    [tuple(frame) for frame in index["frames"]]
+                    if index["frames"]
+                    else None
+                ),
+            )
+
+        result = atlas.build_atlas(paths, **kwargs)
+        self._store_entry(
+            key,
+            result.pages,
+            rects=[list(rect) for rect in result.rects],
+            frames=[list(frame) for frame in result.frames] if result.frames else None,
+        )
+        return result
+
+    def load(self, key: str, name: str, texture_filter: SamplerState) -> list:
+        """Load textures of entry with provided key. Returns None on miss"""
+        loaded = self._load_entry(key, name, texture_filter)
+        if loaded is None:
+            return None
+        textures, index = loaded
+        for texture in textures:
+            texture.set_orig_file_size(*index["orig_size"], 1)
+        return textures
+
+    def _load_entry(self, key: str, name: str, texture_filter: SamplerState) -> tuple:
+        """Load textures and index of entry with provided key. Returns None on
+        miss"""
+        index_path, blob_path = self._get_paths(key)
+        index = self._read_json(index_path)
+        if not index or index.get("version") != CACHE_VERSION:
+            return None
+
+        try:
+            blob_file = open(blob_path, "rb")
+        except OSError:
+            return None
+
+        textures = []
+        with blob_file, mmap.mmap(
+            blob_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as blob:
+            with memoryview(blob) as view:
+                for num, (start, length, x_size, y_size) in enumerate(
+                    index["textures"]
+                ):
+                    texture = Texture(f"{name}_{num}")
+                    texture.setup_2d_texture(
+                        x_size,
+                        y_size,
+                        index["component_type"],
+                        index["format"],
+                    )
+                    with view[start : start + length] as image:
+                        texture.set_ram_image(image)
+                    if texture_filter is not None:
+                        texture.set_magfilter(texture_filter)
+                        texture.set_minfilter(texture_filter)
+                    textures.append(texture)
+
+        # Marking entry as recently used
+        os.utime(index_path)
+        return textures, index
+
+    def store(self, key: str, textures: list, sprite_sizes: tuple):
+        """Save provided textures into cache under provided key"""
+        self._store_entry(key, textures, orig_size=list(sprite_sizes))
+
+    def _store_entry(self, key: str, textures: list, **extra):
+        """Save provided textures into cache under provided key. Extra values
+        are saved into entry's index"""
+        if not textures:
+            return
+
+        index_path, blob_path = self._get_paths(key)
+        entries = []
+        position = 0
+        with open(blob_path, "wb") as blob:
+            for texture in textures:
+                data = memoryview(texture.get_ram_image())
+                blob.write(data)
+                entries.append(
+                    (position, data.nbytes, texture.get_x_size(), texture.get_y_size())
+                )
+                position += data.nbytes
+
+        first = textures[0]
+        index = {
+            "version": CACHE_VERSION,
+            "component_type": int(first.get_component_type()),
+            "format": int(first.get_format()),
+            "textures": entries,
+            **extra,
+        }
+        # Writing index last, so interrupted writes wont leave valid entries
+        with open(index_path, "w") as f:
+            json.dump(index, f)
+
+        self.evict()
+
+    def get_size(self) -> int:
+        """Get total size of cache entries, in bytes"""
+        return sum(
+            entry.stat().st_size
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith((".bin", ".json")) and entry.name != "sources.json"
+        )
+
+    def evict(self):
+        """Remove least recently used entries, till cache fits into max_size"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json") or entry.name == "sources.json":
+                continue
+            key = entry.name[: -len(".json")]
+            blob_path = self._get_paths(key)[1]
+            size = entry.stat().st_size
+            if os.path.isfile(blob_path):
+                size += os.path.getsize(blob_path)
+            entries.append((entry.stat().st_mtime, key, size))
+            total += size
+
+        entries.sort()
+        for _, key, size in entries:
+            if total <= self.max_size:
+                break
+            for path in self._get_paths(key):
+                if os.path.isfile(path):
+                    os.remove(path)
+            total -= size
+            log.debug("Evicted %s from sprite cache", key)
+
+    def clear(self):
+        """Remove all entries from cache"""
+        for filename in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, filename))
+        self.sources = {}
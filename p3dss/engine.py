@@ -0,0 +1,242 @@
+import logging
+from . import exceptions, types
+from .scheduler import AnimationScheduler
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+log = logging.getLogger(__name__)
+
+
+class VectorizedScheduler(AnimationScheduler):
+    """Scheduler that keeps playback state of active nodes in numpy arrays.
+
+    Instead of calling update() of each node, it advances timers of all of them
+    at once and only calls into nodes whose frame has actually changed. This
+    requires numpy to be installed.
+
+    While node is being advanced by this scheduler, its frame_time_left and
+    current_sequence_item are only synced back on frame change or deactivation.
+    """
+
+    def __init__(
+        self,
+        task_mgr=None,
+        name: str = None,
+        sort: int = 0,
+        timing: types.TimingMode = types.TimingMode.frame,
+        update_rate: float = None,
+        capacity: int = 256,
+    ):
+        if np is None:
+            raise exceptions.MissingDependency("numpy", "VectorizedScheduler")
+
+        super().__init__(
+            task_mgr, name or "p3dss vectorized scheduler", sort, timing, update_rate
+        )
+
+        # Amount of nodes stored in arrays below. Slots past it are garbage
+        self.count = 0
+        # Node that occupies each slot. Slot of each node is stored in self.active
+        self.slots = []
+
+        self.time_left = np.zeros(capacity, dtype=np.float64)
+        # Time it takes to play item of each slot once
+        self.cycle = np.zeros(capacity, dtype=np.float64)
+        self.sequence = np.zeros(capacity, dtype=np.int32)
+        self.item_start = np.zeros(capacity, dtype=np.int32)
+        self.item_length = np.ones(capacity, dtype=np.int32)
+        self.loop = np.zeros(capacity, dtype=bool)
+
+        # Sprite sequences of all items (and durations of their sprites),
+        # flattened into single table. Each item is only stored once, no matter
+        # how many nodes play it
+        self.item_ranges = {}
+        self._sprite_list = []
+        self._duration_list = []
+        self.sprite_table = np.zeros(0, dtype=np.int32)
+        self.duration_table = np.zeros(0, dtype=np.float64)
+
+        # Nodes that have finished playback of item with reset_on_complete
+        self._pending_reset = []
+
+    def _grow(self):
+        """Double capacity of state arrays"""
+        for attr in (
+            "time_left",
+            "cycle",
+            "sequence",
+            "item_start",
+            "item_length",
+            "loop",
+        ):
+            array = getattr(self, attr)
+            grown = np.zeros(len(array) * 2, dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, attr, grown)
+
+    def _get_item_range(self, item: types.SpritesheetItem) -> tuple:
+        """Get (start, length) of item's sprites in sprite_table"""
+        item_range = self.item_ranges.get(item)
+        if item_range is None:
+            item_range = (len(self._sprite_list), len(item.sprites))
+            self._sprite_list.extend(item.sprites)
+            self._duration_list.extend(
+                item.get_frame_duration(num) for num in range(len(item.sprites))
+            )
+            self.sprite_table = np.array(self._sprite_list, dtype=np.int32)
+            self.duration_table = np.array(self._duration_list, dtype=np.float64)
+            self.item_ranges[item] = item_range
+        return item_range
+
+    def activate(self, node):
+        if node in self.active:
+            return
+
+        if self.count == len(self.time_left):
+            self._grow()
+
+        item = node.active_item
+        slot = self.count
+        self.item_start[slot], self.item_length[slot] = self._get_item_range(item)
+        self.time_left[slot] = node.frame_time_left
+        self.cycle[slot] = item.get_duration()
+        self.sequence[slot] = node.current_sequence_item
+        self.loop[slot] = item.loop
+
+        self.slots.append(node)
+        self.active[node] = slot
+        self.count += 1
+
+    def deactivate(self, node):
+        slot = self.active.pop(node, None)
+        if slot is None:
+            return
+
+        node.frame_time_left = float(self.time_left[slot])
+        node.current_sequence_item = int(self.sequence[slot])
+
+        # Moving last node into freed slot, to keep arrays dense
+        last = self.count - 1
+        if slot != last:
+            moved = self.slots[last]
+            for array in (
+                self.time_left,
+                self.cycle,
+                self.sequence,
+                self.item_start,
+                self.item_length,
+                self.loop,
+            ):
+                array[slot] = array[last]
+            self.slots[slot] = moved
+            self.active[moved] = slot
+        self.slots.pop()
+        self.count = last
+
+    def update(self, dt: float):
+        # Nodes that finished their items on previous frame get a chance to
+        # reset to their default items, same as with regular scheduler. Ones
+        # that have started to play their default items shouldnt be advanced on
+        # the same frame, thus their slots are held in place
+        held = None
+        if self._pending_reset:
+            pending = self._pending_reset
+            self._pending_reset = []
+            for node in pending:
+                if node in self.active:
+                    node.update(0)
+            held = [self.active[node] for node in pending if node in self.active]
+        self._advance(dt, held)
+
+    def _advance(self, dt: float, held: list = None):
+        """Advance timers of all active nodes, except ones in held slots, and
+        switch sprites of ones that need it"""
+        count = self.count
+        if not count:
+            return
+
+        time_left = self.time_left[:count]
+        if held:
+            held_time = time_left[held]
+        time_left -= dt
+        if held:
+            time_left[held] = held_time
+        changed = np.flatnonzero(time_left <= 0)
+        if not changed.size:
+            return
+
+        catch_up = self.timing is types.TimingMode.elapsed
+        if catch_up and dt >= self.cycle[:count].min():
+            # Skipping whole cycles of looped items that lag behind by more than
+            # that, since they would end up on the same sprite anyway. Nodes
+            # cant lag behind by more than dt, thus its rarely needed
+            lag = -time_left[changed]
+            cycle = self.cycle[changed]
+            skip = self.loop[changed] & (cycle > 0) & (lag >= cycle)
+            if skip.any():
+                skipped = changed[skip]
+                time_left[skipped] += np.floor(lag[skip] / cycle[skip]) * cycle[skip]
+        elif not catch_up:
+            # Time that has been overshot is lost, only one sprite gets switched
+            time_left[changed] = 0
+
+        # Switching sprites till all nodes catch up with time that has passed.
+        # Usually its done once, since frames are shorter than sprites
+        sprites = np.empty(changed.size, dtype=np.int32)
+        finished = []
+        pending = np.arange(changed.size)
+        for _ in range(int(self.item_length[changed].max()) + 1):
+            pending_slots = changed[pending]
+            sequence = self.sequence[pending_slots]
+            index = self.item_start[pending_slots] + sequence
+            sprites[pending] = self.sprite_table[index]
+            time_left[pending_slots] += self.duration_table[index]
+
+            sequence += 1
+            ended = sequence >= self.item_length[pending_slots]
+            sequence[ended] = 0
+            self.sequence[pending_slots] = sequence
+            ended &= ~self.loop[pending_slots]
+            if ended.any():
+                finished.append(pending_slots[ended])
+
+            if not catch_up:
+                break
+            pending = pending[(time_left[pending_slots] <= 0) & ~ended]
+            if not pending.size:
+                break
+        else:
+            # Items with zero duration, there is no way to catch up with them
+            time_left[changed[pending]] = 0
+
+        # Nodes are looked up before any of them gets shown, since show_sprite()
+        # may destroy node (if it has been removed from scene) and thus move
+        # other nodes between slots
+        slots = self.slots
+        changed_nodes = [slots[slot] for slot in changed.tolist()]
+        if finished:
+            finished = np.concatenate(finished)
+            finished = [slots[slot] for slot in finished.tolist()]
+
+        for node, sprite, sequence_item in zip(
+            changed_nodes, sprites.tolist(), self.sequence[changed].tolist()
+        ):
+            node.current_sequence_item = sequence_item
+            if node.use_shader:
+                # Shader handles visuals on its own, just keeping track of it
+                node.current_sprite = sprite
+            else:
+                node.show_sprite(sprite)
+
+        if finished:
+            for node in finished:
+                if node not in self.active:
+                    continue
+                node.playing = types.PlaybackState.pause
+                if node.active_item.reset_on_complete:
+                    self._pending_reset.append(node)
+                else:
+                    self.deactivate(node)
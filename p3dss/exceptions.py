@@ -11,3 +11,23 @@ class InvalidSpriteSize(Exception):
     def __init__(self, spritesheet, sprite_sizes):
         message = f"{spritesheet} wont cut into {sprite_sizes} chunks perfectly"
         super().__init__(message)
+
+
+class MissingDependency(Exception):
+    """Exception thrown on attempt to use functionality that relies on optional
+    dependency, which isnt installed
+    """
+
+    def __init__(self, dependency, feature):
+        message = f"{feature} requires {dependency}, which is not installed"
+        super().__init__(message)
+
+
+class SpriteTooBig(Exception):
+    """Exception thrown if sprite doesnt fit into atlas page"""
+
+    def __init__(self, sprite, sprite_sizes, page_size):
+        message = (
+            f"Sprite {sprite} of size {sprite_sizes} wont fit into {page_size}px page"
+        )
+        super().__init__(message)
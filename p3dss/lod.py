@@ -0,0 +1,185 @@
+import logging
+from collections import OrderedDict
+from math import ceil, inf
+from panda3d.core import BoundingSphere, BoundingVolume, NodePath
+from . import types
+from .scheduler import AnimationScheduler
+
+log = logging.getLogger(__name__)
+
+
+class LODScheduler(AnimationScheduler):
+    """Scheduler that advances nodes less often, depending on how they are seen
+    by camera.
+
+    Nodes outside of camera's view frustum are frozen - they dont get updated at
+    all till they become visible again. Nodes that are farther from camera than
+    distances in lod_levels get updated with matching update rates, e.g
+    ((50, 20), (150, 5)) will update nodes farther than 50 units 20 times per
+    second, and nodes farther than 150 units - 5 times per second.
+
+    Each node keeps track of time it has been last updated at, thus on its next
+    update it receives all time that has passed since then. This requires
+    TimingMode.elapsed, so frames are correct once node returns to full rate.
+
+    Nodes get reclassified gradually, so that each of them is checked about
+    check_rate times per second. Only nodes with "node" attribute (such as
+    SpritesheetNode) can be throttled - others always get updated each frame.
+    """
+
+    def __init__(
+        self,
+        camera: NodePath = None,
+        lod_levels: tuple = (),
+        freeze_offscreen: bool = True,
+        margin: float = 1.0,
+        check_rate: float = 10.0,
+        task_mgr=None,
+        name: str = None,
+        sort: int = 0,
+        timing: types.TimingMode = types.TimingMode.elapsed,
+        update_rate: float = None,
+    ):
+        super().__init__(
+            task_mgr, name or "p3dss lod scheduler", sort, timing, update_rate
+        )
+        if timing != types.TimingMode.elapsed:
+            log.warning("%s wont keep frames correct without elapsed timing", self.name)
+
+        # Camera node with lens. If not set - base.cam is used. Without both,
+        # all nodes get updated each frame, same as with AnimationScheduler
+        self.camera = camera
+        # (distance, update rate) pairs, sorted by distance
+        self.lod_levels = tuple(sorted(lod_levels))
+        self.freeze_offscreen = freeze_offscreen
+        # Radius around node's origin that should be in view to consider node
+        # visible. Should be about the size of node's card
+        self.margin = margin
+        self.check_interval = 1 / check_rate
+
+        # Time that has passed since creation of scheduler
+        self.time = 0.0
+        # Minimal time between updates of nodes on each level. First level is for
+        # nodes that get updated each frame, last - for frozen ones
+        self.intervals = (0.0, *(1 / rate for _, rate in self.lod_levels), inf)
+        self.frozen = len(self.intervals) - 1
+        # Nodes on each level, mapped to time they have been last updated at.
+        # Throttled levels are ordered by that time, from oldest to newest
+        self.levels = [OrderedDict() for _ in self.intervals]
+        # Active nodes, mapped to their levels. Ordered by time of their last
+        # check, from oldest to newest
+        self.active = OrderedDict()
+        self._advanced = 0
+        # Camera and bounds of its lens, updated each frame
+        self._view = None
+
+    def _get_view(self) -> tuple:
+        """Get camera and bounds of its lens, in camera's coordinate space. If
+        there is no camera (e.g in windowless app) - both are None"""
+        if self._view is None:
+            camera = self.camera or getattr(base, "cam", None)
+            if camera is None:
+                self._view = (None, None)
+            else:
+                self._view = (camera, camera.node().get_lens().make_bounds())
+        return self._view
+
+    def _get_level(self, node, camera: NodePath, lens_bounds) -> int:
+        """Get level of provided node, depending on its position to camera"""
+        node_path = getattr(node, "node", None)
+        if node_path is None or camera is None or node_path.is_empty():
+            # Removed nodes get destroyed on their next sprite change
+            return 0
+
+        position = node_path.get_pos(camera)
+        if self.freeze_offscreen:
+            if node_path.is_hidden():
+                return self.frozen
+            sphere = BoundingSphere(position, self.margin)
+            if not lens_bounds.contains(sphere) & BoundingVolume.IF_some:
+                return self.frozen
+
+        level = 0
+        distance = position.length()
+        for num, (level_distance, _) in enumerate(self.lod_levels, 1):
+            if distance < level_distance:
+                break
+            level = num
+        return level
+
+    def _set_level(self, node, level: int):
+        current = self.active[node]
+        if current == level:
+            return
+        last = self.levels[current].pop(node)
+        self.active[node] = level
+        if 0 < level < self.frozen:
+            # Throttled levels are ordered by time of last update, thus node
+            # gets updated right away to be placed at the end of its new level
+            self.levels[level][node] = self.time
+            self._advanced += 1
+            node.update(self.time - last)
+        else:
+            self.levels[level][node] = last
+
+    def check(self, amount: int = None):
+        """Reclassify provided amount of nodes that have been checked the
+        longest time ago. If amount isnt set - all active nodes get checked"""
+        amount = len(self.active) if amount is None else min(amount, len(self.active))
+        if not amount:
+            return
+
+        camera, lens_bounds = self._get_view()
+        active = self.active
+        for _ in range(amount):
+            node = next(iter(active))
+            active.move_to_end(node)
+            self._set_level(node, self._get_level(node, camera, lens_bounds))
+
+    def activate(self, node):
+        if node in self.active:
+            return
+
+        level = self._get_level(node, *self._get_view())
+        self.active[node] = level
+        self.levels[level][node] = self.time
+
+    def deactivate(self, node):
+        level = self.active.pop(node, None)
+        if level is not None:
+            self.levels[level].pop(node, None)
+
+    def update(self, dt: float):
+        self.time += dt
+        now = self.time
+        # Lens may have changed since previous frame
+        self._view = None
+        self._advanced = 0
+        self.check(ceil(len(self.active) * dt / self.check_interval))
+
+        advanced = self._advanced
+        # Nodes that get updated each frame
+        level = self.levels[0]
+        for node, last in tuple(level.items()):
+            if node in level:
+                level[node] = now
+                node.update(now - last)
+                advanced += 1
+
+        # Throttled nodes. These are ordered by time of last update, thus only
+        # the ones at the beginning are checked
+        for level, interval in zip(self.levels[1:-1], self.intervals[1:-1]):
+            while level:
+                node = next(iter(level))
+                last = level[node]
+                if now - last < interval:
+                    break
+                level.move_to_end(node)
+                level[node] = now
+                node.update(now - last)
+                advanced += 1
+
+        self._advanced = advanced
+
+    def _get_advanced_count(self, active: int) -> int:
+        return self._advanced
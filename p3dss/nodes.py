@@ -1,54 +1,115 @@
 import logging
-from panda3d.core import CardMaker, TextureStage, Texture, NodePath, Vec3, PythonTask
-from . import processor, types
+from functools import lru_cache
+from panda3d.core import (
+    CardMaker,
+    CullFaceAttrib,
+    Geom,
+    GeomNode,
+    RenderState,
+    TextureAttrib,
+    TransformState,
+    TransparencyAttrib,
+    TextureStage,
+    Texture,
+    NodePath,
+    Vec3,
+    LVecBase4,
+    PTA_LVecBase2f,
+)
+from . import processor, shaders, types
+from .animations import AnimationSet
+from .scheduler import AnimationScheduler, get_default_scheduler
 
 log = logging.getLogger(__name__)
 
 
-def make_sprite_node(
-    sprite: Texture,
-    size: tuple = None,
-    name: str = None,
-    is_two_sided: bool = True,
-    is_transparent: bool = True,
-    parent: NodePath = None,
-    position: Vec3 = None,
-    scale: float = 0.0,
-) -> NodePath:
-    """Make flat single-sprite node out of provided data"""
-    # Using WM_clamp instead of WM_mirror, to avoid issue with black 1-pixel
-    # bars appearing on top of spritesheet randomly.
-    # Idk if this needs to have possibility to override it #TODO
-    sprite.set_wrap_u(Texture.WM_clamp)
-    sprite.set_wrap_v(Texture.WM_clamp)
-
-    # Creating CardMaker frame
-    card = CardMaker(name or sprite.get_name() or "sprite")
-    # This will fail if texture has been generated with no set_orig_file_size()
-    size = size or (sprite.get_orig_file_x_size(), sprite.get_orig_file_y_size())
-
+# Cached, so nodes of the same size share the same frame tuple
+@lru_cache(maxsize=None)
+def _get_card_frame(size: tuple) -> tuple:
+    """Get (left, right, bottom, top) of card with provided size"""
     # Been told that its not in pixels, thus accepting either 1, 2 or 4 values
     # Kinda jank, I know
     if len(size) > 3:
-        card.set_frame(-size[0], size[1], -size[2], size[3])
+        return (-size[0], size[1], -size[2], size[3])
     elif len(size) > 1:
-        card.set_frame(-size[0], size[0], -size[1], size[1])
+        return (-size[0], size[0], -size[1], size[1])
     else:
-        card.set_frame(-size[0], size[0], -size[0], size[0])
+        return (-size[0], size[0], -size[0], size[0])
 
-    parent = parent or NodePath()
-    node = parent.attach_new_node(card.generate())
-    node.set_texture(sprite)
 
+@lru_cache(maxsize=None)
+def _get_card_geom(frame: tuple) -> Geom:
+    """Get card geometry with provided frame. Its shared by all cards of the
+    same size - geoms are copy-on-write, thus changes of one card (e.g on
+    flatten) wont affect others"""
+    card = CardMaker("card")
+    card.set_frame(*frame)
+    return card.generate().modify_geom(0)
+
+
+def make_sprite_state(
+    sprite: Texture, is_two_sided: bool = True, is_transparent: bool = True
+) -> RenderState:
+    """Make render state of sprite card. Can be shared between nodes of the
+    same texture, to avoid composing it for each of them"""
+    attribs = [TextureAttrib.make(sprite)]
     # Making it possible to utilize texture's alpha channel settings
     # This is a float from 0 to 1, but I dont think there is a point to only
     # show half of actual object's transparency.
     # Do it manually afterwards if thats what you need
     if is_transparent:
-        node.set_transparency(1)
+        attribs.append(TransparencyAttrib.make(TransparencyAttrib.M_alpha))
     # Enabling ability to render texture on both front and back of card
     if is_two_sided:
-        node.set_two_sided(True)
+        attribs.append(CullFaceAttrib.make(CullFaceAttrib.M_cull_none))
+    return RenderState.make(*attribs)
+
+
+def _set_wrap_mode(sprite: Texture):
+    # Using WM_clamp instead of WM_mirror, to avoid issue with black 1-pixel
+    # bars appearing on top of spritesheet randomly.
+    # Idk if this needs to have possibility to override it #TODO
+    # Only doing it once, since each change marks texture as modified
+    if sprite.get_wrap_u() != Texture.WM_clamp:
+        sprite.set_wrap_u(Texture.WM_clamp)
+    if sprite.get_wrap_v() != Texture.WM_clamp:
+        sprite.set_wrap_v(Texture.WM_clamp)
+
+
+def _get_sprite_size(sprite: Texture, size: tuple) -> tuple:
+    # This will fail if texture has been generated with no set_orig_file_size()
+    return tuple(size or (sprite.get_orig_file_x_size(), sprite.get_orig_file_y_size()))
+
+
+def _make_card(name: str, geom: Geom, state: RenderState, parent: NodePath):
+    card = GeomNode(name)
+    card.add_geom(geom)
+    card.set_state(state)
+    return parent.attach_new_node(card)
+
+
+def make_sprite_node(
+    sprite: Texture,
+    size: tuple = None,
+    name: str = None,
+    is_two_sided: bool = True,
+    is_transparent: bool = True,
+    parent: NodePath = None,
+    position: Vec3 = None,
+    scale: float = 0.0,
+    render_state: RenderState = None,
+) -> NodePath:
+    """Make flat single-sprite node out of provided data. If render_state has
+    been passed (see make_sprite_state()), its used instead of is_two_sided and
+    is_transparent"""
+    _set_wrap_mode(sprite)
+    geom = _get_card_geom(_get_card_frame(_get_sprite_size(sprite, size)))
+    if render_state is None:
+        render_state = make_sprite_state(sprite, is_two_sided, is_transparent)
+
+    parent = parent or NodePath()
+    node = _make_card(name or sprite.get_name() or "sprite", geom, render_state, parent)
+
     # Setting object's position. This is done relatively to parent, thus if you
     # didnt pass any, it may be a bit janky
     if position:
@@ -60,74 +121,117 @@ def make_sprite_node(
     return node
 
 
-class SpritesheetNode:
-    """Flat node with multiple sprites from single spritesheet attached to it"""
+def make_sprite_nodes(
+    sprite: Texture,
+    count: int,
+    size: tuple = None,
+    name: str = None,
+    is_two_sided: bool = True,
+    is_transparent: bool = True,
+    parent: NodePath = None,
+    positions: list = None,
+    scale: float = 0.0,
+) -> list:
+    """Make provided amount of single-sprite nodes at once. Card geometry and
+    render state are only made once and shared by all of them. If positions
+    are passed, there should be one for each node"""
+    _set_wrap_mode(sprite)
+    geom = _get_card_geom(_get_card_frame(_get_sprite_size(sprite, size)))
+    state = make_sprite_state(sprite, is_two_sided, is_transparent)
+    name = name or sprite.get_name() or "sprite"
+    parent = parent or NodePath()
+
+    nodes = []
+    for num in range(count):
+        node = _make_card(name, geom, state, parent)
+        if positions:
+            node.set_pos(*positions[num])
+        if scale and scale > 0:
+            node.set_scale(scale)
+        nodes.append(node)
+
+    return nodes
+
+
+def _is_shader_item(item: types.SpritesheetItem, name: str) -> bool:
+    """Check if provided item can be played in shader mode. Warns if it cant"""
+    if len(item.sprites) > shaders.MAX_SHADER_FRAMES:
+        log.warning(
+            "%s has more than %s sprites, thus cant be played by shader",
+            name,
+            shaders.MAX_SHADER_FRAMES,
+        )
+        return False
+    if item.frame_durations is not None:
+        log.warning("%s has frame durations, which shader doesnt support", name)
+        return False
+    return True
+
+
+class SpritesheetPlayback:
+    """Playback of named spritesheet items. Doesnt show anything on its own -
+    subclasses decide how switching between sprites is done, via show_sprite().
+
+    Since games may have tens of thousands of these, instances have no __dict__.
+    Items table can be shared between nodes - if provided on creation (either
+    as dict or as AnimationSet), its used by reference and only gets copied once
+    add_item() is called on node.
+    """
+
+    __slots__ = (
+        "name",
+        "offsets",
+        "default_sprite",
+        "current_sprite",
+        "items",
+        "_items_shared",
+        "animation_set",
+        "default_item",
+        "current_item",
+        "active_item",
+        "playing",
+        "frame_time_left",
+        "current_sequence_item",
+        "scheduler",
+    )
+
+    # If enabled, sprites are switched outside of python (e.g by shader), and
+    # update() only keeps track of them
+    use_shader = False
 
     def __init__(
         self,
-        spritesheet: Texture,
-        sprite_sizes: tuple,
-        node_sizes: tuple = None,
-        name: str = None,
-        is_two_sided: bool = False,
-        # Maybe I should rename this to "has_transparency" or "has_alpha_channel"?
-        # #TODO
-        is_transparent: bool = True,
-        parent: NodePath = None,
-        scale: float = 0.0,
+        name: str,
+        offsets: list,
         default_sprite: int = 0,
-        position: Vec3 = None,
+        scheduler: AnimationScheduler = None,
+        items: dict = None,
+        animation_set: AnimationSet = None,
     ):
-
-        parent = parent or NodePath()
-        # name of animated object
-        self.name = name or spritesheet.get_name() or "SpritesheetNode"
-        self.sprite_sizes = sprite_sizes
-        self.node_sizes = node_sizes or self.sprite_sizes
-
-        sprite_data = processor.get_offsets(spritesheet, self.sprite_sizes)
-
-        self.offsets = sprite_data.offsets
-
-        self.node = make_sprite_node(
-            sprite=spritesheet,
-            # This is kept for backwards compatibility. I should probably make
-            # generated objects have unified size measurement values across whole
-            # library #TODO
-            # size=(self.sizes[0] / 2, self.sizes[1] / 2),
-            size=self.node_sizes,
-            name=self.name,
-            is_two_sided=is_two_sided,
-            is_transparent=is_transparent,
-            parent=parent,
-            position=position,
-            scale=scale,
-        )
-
-        # Sprite shown right now. This will crash if its value is greater than
+        self.name = name
+        self.offsets = offsets
+        # Sprite shown on creation. This will crash if its value is greater than
         # amount of sprites in sheet
+        self.default_sprite = default_sprite
+        # Sprite shown right now
         self.current_sprite = default_sprite
 
-        # okay, this does the magic
-        # basically, to show the very first sprite of 2 in row, we set tex scale
-        # to half (coz half is our normal char's size). If we will need to use it
-        # with sprites other than first - then we also should adjust offset accordingly
-        self.node.set_tex_scale(TextureStage.getDefault(), *sprite_data.step_sizes)
-
-        # now,lets say, we need to use second sprite from sheet. Just do:
-        # self.node.set_tex_offset(TextureStage.getDefault(), *offsets[1])
-        self.node.set_tex_offset(
-            TextureStage.getDefault(), *self.offsets[self.current_sprite]
-        )
-
-        self.items = {}
+        # Set of items, whose ids can be passed to play()
+        self.animation_set = animation_set
+        if animation_set is not None and items is None:
+            items = animation_set.items
+        self.items = {} if items is None else items
+        # If items table belongs to multiple nodes. Its copied on modification
+        self._items_shared = items is not None
         # Name of item to reset playback to. If not set, playback of non-looped
         # items with reset_on_complete will stop at their last frame
-        self.default_item = None
+        self.default_item = animation_set.default_item if animation_set else None
         # setting this to None may cause crashes on few rare cases, but going
         # for "idle_right" wont work for projectiles... So I technically add it
         # there for anims updater, but its meant to be overwritten at 100% cases
         self.current_item = None
+        # SpritesheetItem of current_item, to avoid looking it up on each update
+        self.active_item = None
         # Items to be played after current. Not implemented right now. #TODO
         # self.queue = []
 
@@ -139,67 +243,101 @@ class SpritesheetNode:
         # Number of item in current sequence that plays right now
         self.current_sequence_item = 0
 
-        def play_current(event: PythonTask) -> PythonTask:
-            """Taskmanager routine that plays currently shown item"""
-            # Destroys the routine if node has been deleted
-            if not self.node:
-                return
-
-            # If no playback is going on right now - either resetting to default
-            # or just doing nothing till next frame
-            if self.playing == types.PlaybackState.stop:
-                return event.cont
-
-            if self.playing == types.PlaybackState.pause:
-                # This will crash if there is no current item, shouldnt happen
-                if (
-                    self.items[self.current_item].reset_on_complete
-                    and self.default_item
-                    and self.default_item != self.current_item
-                ):
-                    self.play(self.default_item)
-                return event.cont
-
-            # Getting delta time since last frame
-            dt = globalClock.get_dt()
-            self.frame_time_left -= dt
-            if self.frame_time_left > 0:
-                return event.cont
-
-            # If amount of time passed has been more than required - resetting
-            # timer and switching to next image in sequence
-            # Idk if this is resource-efficient, will see #TODO
-            self.frame_time_left = self.items[self.current_item].playback_speed
-
-            self.current_sprite = self.items[self.current_item].sprites[
-                self.current_sequence_item
-            ]
-            self.node.set_tex_offset(
-                TextureStage.getDefault(), *self.offsets[self.current_sprite]
-            )
+        # Scheduler that will advance our playback. Node only gets updated by it
+        # while something plays
+        self.scheduler = scheduler or get_default_scheduler()
+        self.scheduler.register(self)
 
-            # idk how to do this better
+    def update(self, dt: float):
+        """Advance currently shown item by provided delta time. Called by
+        scheduler each frame, for as long as node has been activated"""
+        if self.playing == types.PlaybackState.pause:
+            # This will crash if there is no current item, shouldnt happen
             if (
-                len(self.items[self.current_item].sprites)
-                > self.current_sequence_item + 1
+                self.active_item.reset_on_complete
+                and self.default_item
+                and self.default_item != self.current_item
             ):
-                self.current_sequence_item += 1
+                self.play(self.default_item)
             else:
-                self.current_sequence_item = 0
-                # if looping is disabled - keeping last frame
-                if not self.items[self.current_item].loop:
-                    self.playing = types.PlaybackState.pause
-                    return event.cont
+                # Nothing else will happen till next play() call
+                self.scheduler.deactivate(self)
+            return
 
-            return event.cont
+        self.frame_time_left -= dt
+        if self.frame_time_left > 0:
+            return
 
-        base.task_mgr.add(play_current, f"Animation task of {self.name}")
+        # If amount of time passed has been more than required - switching to
+        # next image in sequence
+        item = self.active_item
+        sprites = item.sprites
+        durations = item.frame_durations
+        sequence_item = self.current_sequence_item
+        catch_up = self.scheduler.timing is types.TimingMode.elapsed
+        if not catch_up:
+            # Time that has been overshot is lost, only one sprite gets switched
+            self.frame_time_left = 0
+
+        # Otherwise, switching sprites till we catch up with time that has passed.
+        # Only the last of them gets actually shown
+        steps = 0
+        while True:
+            sprite = sprites[sequence_item]
+            if durations is None:
+                self.frame_time_left += item.playback_speed
+            else:
+                self.frame_time_left += durations[sequence_item]
+            sequence_item += 1
+            if sequence_item >= len(sprites):
+                sequence_item = 0
+                # if looping is disabled - keeping last frame
+                if not item.loop:
+                    self.playing = types.PlaybackState.pause
+                    break
+
+            if self.frame_time_left > 0 or not catch_up:
+                break
+            steps += 1
+            if steps == len(sprites):
+                # Whole cycle has passed, skipping the rest of them at once
+                duration = item.get_duration()
+                if duration <= 0:
+                    self.frame_time_left = 0
+                    break
+                remainder = self.frame_time_left % duration
+                self.frame_time_left = remainder - duration if remainder else 0
+                steps = 0
+
+        self.current_sequence_item = sequence_item
+        if self.use_shader:
+            # Shader handles visuals on its own, just keeping track of it
+            self.current_sprite = sprite
+        else:
+            self.show_sprite(sprite)
+
+    def show_sprite(self, sprite: int):
+        """Switch to sprite with provided number"""
+        raise NotImplementedError
+
+    def _start_playback(self, item: types.SpritesheetItem):
+        """Called by play() once playback of provided item has begun"""
+        self.scheduler.activate(self)
+
+    def _stop_playback(self):
+        """Called by stop() before current item gets reset"""
+        self.scheduler.deactivate(self)
 
     def add_item(
         self, item: types.SpritesheetItem, name: str = None, set_default: bool = False
     ):
         """Add provided item into self.items"""
         name = name or item.name
+        if self.use_shader and not _is_shader_item(item, name):
+            return
+        if self._items_shared:
+            self.items = dict(self.items)
+            self._items_shared = False
         self.items[name] = item
         if set_default:
             self.default_item = name
@@ -207,34 +345,373 @@ class SpritesheetNode:
     def set_default(self, item_name: str):
         """Set item with provided name to default"""
         if not item_name in self.items:
-            log.warning(f"{self.name} has no item named {item_name}!")
+            log.warning("%s has no item named %s!", self.name, item_name)
             return
 
         self.default_item = item_name
 
-    def play(self, item_name: str, ignore_if_current: bool = True):
-        """Make node switch to showcase of selected spritesheet's item"""
+    def play(self, item_name, ignore_if_current: bool = True):
+        """Make node switch to showcase of selected spritesheet's item. Item can
+        be referred either by name, or by its id in node's animation_set"""
+        if isinstance(item_name, int):
+            self._play_id(item_name, ignore_if_current)
+            return
+
         # safety check to ensure that we wont crash everything with exception by
         # trying to play animation that doesnt exist
-        if not item_name in self.items:
-            log.warning(f"{self.name} has no item named {item_name}!")
+        item = self.items.get(item_name)
+        if item is None:
+            log.warning("%s has no item named %s!", self.name, item_name)
             return
 
         if ignore_if_current and self.current_item == item_name:
-            log.debug(f"{self.name} already plays {item_name}, wont switch")
+            log.debug("%s already plays %s, wont switch", self.name, item_name)
+            return
+
+        self._play_item(item_name, item)
+
+    def _play_id(self, item_id: int, ignore_if_current: bool):
+        """Play item with provided id. Items are taken from animation_set's
+        entries directly, without looking them up by name"""
+        animation_set = self.animation_set
+        if animation_set is None or not 0 <= item_id < len(animation_set.entries):
+            log.warning("%s has no item with id %s!", self.name, item_id)
+            return
+
+        item = animation_set.entries[item_id]
+        if ignore_if_current and self.active_item is item:
+            return
+
+        self._play_item(item.name, item)
+
+    def _play_item(self, item_name: str, item: types.SpritesheetItem):
+        # Shared tables (and animation sets) dont go through add_item(), thus
+        # their items are only checked once played
+        if self.use_shader and not _is_shader_item(item, item_name):
             return
 
         self.stop()
 
         self.current_item = item_name
-        self.frame_time_left = self.items[item_name].playback_speed
+        self.active_item = item
+        self.frame_time_left = item.playback_speed
         self.playing = types.PlaybackState.play
-        log.debug(f"{self.name} started playing {self.current_item}")
+        self._start_playback(item)
+        stats = self.scheduler.stats
+        if stats is not None:
+            stats.plays[item_name] += 1
+        log.debug("%s started playing %s", self.name, item_name)
 
     def stop(self):
         """Stop current playback and reset self.current_item"""
         if self.current_item:
+            self._stop_playback()
             self.playing = types.PlaybackState.stop
-            log.debug(f"{self.name} has stopped playback of {self.current_item}")
+            stats = self.scheduler.stats
+            if stats is not None:
+                stats.stops[self.current_item] += 1
+            log.debug("%s has stopped playback of %s", self.name, self.current_item)
             self.current_item = None
+            self.active_item = None
             self.current_sequence_item = 0
+
+    def destroy(self):
+        """Stop playback and remove self from scheduler"""
+        self.stop()
+        self.scheduler.unregister(self)
+
+
+class SpritesheetNode(SpritesheetPlayback):
+    """Flat node with multiple sprites from single spritesheet attached to it"""
+
+    __slots__ = (
+        "sprite_sizes",
+        "node_sizes",
+        "scales",
+        "frames",
+        "node",
+        "card",
+        "card_frame",
+        "use_shader",
+        "animation_start",
+        "bake_group",
+    )
+
+    def __init__(
+        self,
+        spritesheet: Texture,
+        sprite_sizes: tuple,
+        node_sizes: tuple = None,
+        name: str = None,
+        is_two_sided: bool = False,
+        # Maybe I should rename this to "has_transparency" or "has_alpha_channel"?
+        # #TODO
+        is_transparent: bool = True,
+        parent: NodePath = None,
+        scale: float = 0.0,
+        default_sprite: int = 0,
+        position: Vec3 = None,
+        scheduler: AnimationScheduler = None,
+        use_shader: bool = False,
+        sprite_data: types.SpritesheetData = None,
+        trim: bool = False,
+        items: dict = None,
+        animation_set: AnimationSet = None,
+        render_state: RenderState = None,
+    ):
+
+        parent = parent or NodePath()
+        self.sprite_sizes = sprite_sizes
+        self.node_sizes = node_sizes or self.sprite_sizes
+
+        # Its possible to pass pre-made sprite data (e.g from atlas), in which
+        # case sprite_sizes are only used to determine size of node
+        if sprite_data is None:
+            if trim:
+                # Cutting transparent borders of each sprite, to reduce overdraw
+                sprite_data = processor.get_trimmed_offsets(
+                    spritesheet, self.sprite_sizes
+                )
+            else:
+                sprite_data = processor.get_offsets(spritesheet, self.sprite_sizes)
+        # Per-sprite texture scales, if sheet has sprites of different sizes
+        self.scales = sprite_data.scales
+        # Per-sprite parts of card to cover, if sprites have been trimmed
+        self.frames = sprite_data.frames
+
+        # name of animated object
+        super().__init__(
+            name=name or spritesheet.get_name() or "SpritesheetNode",
+            offsets=sprite_data.offsets,
+            default_sprite=default_sprite,
+            scheduler=scheduler,
+            items=items,
+            animation_set=animation_set,
+        )
+
+        # If sprites have been trimmed, card needs to be resized to fit each of
+        # them. To avoid messing with node's own transform, its done on child
+        # node with actual geometry, while self.node serves as its pivot
+        if self.frames:
+            self.node = parent.attach_new_node(self.name)
+            if position:
+                self.node.set_pos(*position)
+            if scale and scale > 0:
+                self.node.set_scale(scale)
+
+        self.card = make_sprite_node(
+            sprite=spritesheet,
+            # This is kept for backwards compatibility. I should probably make
+            # generated objects have unified size measurement values across whole
+            # library #TODO
+            # size=(self.sizes[0] / 2, self.sizes[1] / 2),
+            size=self.node_sizes,
+            name=self.name,
+            is_two_sided=is_two_sided,
+            is_transparent=is_transparent,
+            parent=self.node if self.frames else parent,
+            position=None if self.frames else position,
+            scale=0.0 if self.frames else scale,
+            render_state=render_state,
+        )
+        self.card_frame = _get_card_frame(tuple(self.node_sizes))
+        if self.frames:
+            self._place_card(self.frames[self.current_sprite])
+        else:
+            self.node = self.card
+
+        # okay, this does the magic
+        # basically, to show the very first sprite of 2 in row, we set tex scale
+        # to half (coz half is our normal char's size). If we will need to use it
+        # with sprites other than first - then we also should adjust offset accordingly
+        # now,lets say, we need to use second sprite from sheet. Just do:
+        # self.node.set_tex_offset(TextureStage.getDefault(), *offsets[1])
+        # On creation, both are set with single transform, to only compose it once
+        self.node.set_tex_transform(
+            TextureStage.getDefault(),
+            TransformState.make_pos_rotate_scale2d(
+                self.offsets[self.current_sprite],
+                0,
+                (
+                    self.scales[self.current_sprite]
+                    if self.scales
+                    else sprite_data.step_sizes
+                ),
+            ),
+        )
+
+        # If enabled, sprite offsets are calculated by shader, based on inputs
+        # set on play() call. Python side only keeps track of non-looped items
+        # (to know when they end), while looped ones cost nothing per frame.
+        # Keep in mind that current_sprite of looped items wont be up to date
+        # till playback stops. If shaders arent available (e.g there is no
+        # window yet, or renderer doesnt support them) - regular mode is used
+        self.use_shader = use_shader
+        # Frame time at which current item has started to play in shader mode
+        self.animation_start = 0.0
+        # StaticSpriteGroup this node has been baked into, if any
+        self.bake_group = None
+        if self.use_shader and self.scales:
+            log.warning(
+                "%s has sprites of different sizes, which isnt supported by "
+                "shader mode. Falling back to regular one",
+                self.name,
+            )
+            self.use_shader = False
+        if self.use_shader and not shaders.is_supported():
+            # Shader wouldnt do anything, thus sprites are switched from python
+            log.warning(
+                "Shaders arent available, thus %s will use regular mode instead",
+                self.name,
+            )
+            self.use_shader = False
+        if self.use_shader:
+            self.node.set_shader(shaders.get_sprite_shader())
+            self.node.set_shader_input("p3dss_step", sprite_data.step_sizes)
+            self.node.set_shader_input("p3dss_frames", PTA_LVecBase2f())
+            self._set_static_shader_sprite()
+
+    @classmethod
+    def bulk_create(
+        cls,
+        spritesheet: Texture,
+        sprite_sizes: tuple,
+        count: int,
+        positions: list = None,
+        **kwargs,
+    ) -> list:
+        """Make provided amount of nodes with the same arguments. Sprite data and
+        render state of cards are only prepared once and shared by all of them.
+        If positions are passed, there should be one for each node"""
+        if kwargs.get("sprite_data") is None:
+            if kwargs.get("trim"):
+                kwargs["sprite_data"] = processor.get_trimmed_offsets(
+                    spritesheet, sprite_sizes
+                )
+            else:
+                kwargs["sprite_data"] = processor.get_offsets(spritesheet, sprite_sizes)
+        if kwargs.get("render_state") is None:
+            kwargs["render_state"] = make_sprite_state(
+                spritesheet,
+                kwargs.get("is_two_sided", False),
+                kwargs.get("is_transparent", True),
+            )
+        position = kwargs.pop("position", None)
+
+        return [
+            cls(
+                spritesheet,
+                sprite_sizes,
+                position=positions[num] if positions else position,
+                **kwargs,
+            )
+            for num in range(count)
+        ]
+
+    def show_sprite(self, sprite: int):
+        """Switch node's texture to sprite with provided number"""
+        if self.node.is_empty():
+            # Node has been removed from scene without destroy() call. This is
+            # only checked on sprite change, to keep scheduler's updates cheap
+            log.debug("%s has been removed from scene, destroying it", self.name)
+            self.destroy()
+            return
+
+        self.current_sprite = sprite
+        if self.use_shader:
+            self.node.set_shader_input("p3dss_initial", self.offsets[sprite])
+        else:
+            self.node.set_tex_offset(TextureStage.getDefault(), *self.offsets[sprite])
+            stats = self.scheduler.stats
+            if stats is not None:
+                stats.tex_offset_calls += 1
+            if self.scales:
+                self.node.set_tex_scale(TextureStage.getDefault(), *self.scales[sprite])
+            if self.frames:
+                self._place_card(self.frames[sprite])
+
+    def _place_card(self, frame: tuple):
+        """Resize and move card to cover provided part of node's full frame"""
+        left, right, bottom, top = frame
+        if right <= left or top <= bottom:
+            # Sprite is fully transparent, there is nothing to draw
+            self.card.hide()
+            return
+
+        self.card.show()
+        card_left, card_right, card_bottom, card_top = self.card_frame
+        scale_x = right - left
+        scale_z = top - bottom
+        self.card.set_pos_hpr_scale(
+            card_left * (1 - scale_x) + (card_right - card_left) * left,
+            0,
+            card_bottom * (1 - scale_z) + (card_top - card_bottom) * bottom,
+            0,
+            0,
+            0,
+            scale_x,
+            1,
+            scale_z,
+        )
+
+    def _set_static_shader_sprite(self):
+        """Make shader show current sprite without any animation"""
+        self.node.set_shader_input("p3dss_initial", self.offsets[self.current_sprite])
+        self.node.set_shader_input("p3dss_animation", LVecBase4(0, 1, 0, 0))
+
+    def _set_shader_animation(self, item: types.SpritesheetItem):
+        """Pass playback info of provided item to shader"""
+        frames = PTA_LVecBase2f()
+        for sprite in item.sprites:
+            frames.push_back(self.offsets[sprite])
+
+        self.animation_start = globalClock.get_frame_time()
+        self.node.set_shader_input("p3dss_initial", self.offsets[self.current_sprite])
+        self.node.set_shader_input("p3dss_frames", frames)
+        self.node.set_shader_input(
+            "p3dss_animation",
+            LVecBase4(
+                self.animation_start,
+                item.playback_speed,
+                len(item.sprites),
+                item.loop,
+            ),
+        )
+
+    def _get_shader_sprite(self) -> int:
+        """Get sprite that shader shows right now"""
+        item = self.active_item
+        elapsed = globalClock.get_frame_time() - self.animation_start
+        step = int(elapsed // item.playback_speed)
+        if step <= 0:
+            return self.current_sprite
+
+        if item.loop:
+            return item.sprites[(step - 1) % len(item.sprites)]
+        return item.sprites[min(step - 1, len(item.sprites) - 1)]
+
+    def _start_playback(self, item: types.SpritesheetItem):
+        if self.bake_group is not None:
+            self.bake_group.remove(self)
+        if not self.use_shader:
+            super()._start_playback(item)
+            return
+
+        self._set_shader_animation(item)
+        # Looped items never end, thus there is nothing to keep track of
+        if not item.loop:
+            self.scheduler.activate(self)
+
+    def _stop_playback(self):
+        if self.use_shader:
+            # Freezing shader on sprite that has been shown on stop
+            self.current_sprite = self._get_shader_sprite()
+            self._set_static_shader_sprite()
+        super()._stop_playback()
+
+    def destroy(self):
+        """Stop playback, remove node from its scheduler and from scene graph"""
+        super().destroy()
+        if self.bake_group is not None:
+            self.bake_group.remove(self)
+        self.node.remove_node()
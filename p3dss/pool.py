@@ -0,0 +1,156 @@
+import logging
+from dataclasses import dataclass
+from panda3d.core import Texture, NodePath, Vec3
+from .animations import AnimationSet
+from .nodes import SpritesheetNode
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """Usage counters of SpritesheetNodePool"""
+
+    # acquire() calls that got node from pool
+    hits: int = 0
+    # acquire() calls that had to create new node
+    misses: int = 0
+    # Nodes returned to pool
+    released: int = 0
+    # Nodes destroyed on release, because pool already had enough of them
+    destroyed: int = 0
+
+
+class SpritesheetNodePool:
+    """Storage of pre-made SpritesheetNode objects of the same spritesheet.
+
+    Meant for short-lived objects (projectiles, effects, etc) that get spawned
+    and removed often. Instead of destroying nodes, release() stashes them to be
+    reused by next acquire() call.
+    Pool is filled up to low_watermark on creation (and on fill() calls), and
+    never keeps more than high_watermark released nodes - extra ones get destroyed.
+    """
+
+    def __init__(
+        self,
+        spritesheet: Texture,
+        sprite_sizes: tuple,
+        items: list = None,
+        default_item: str = None,
+        low_watermark: int = 0,
+        high_watermark: int = 64,
+        parent: NodePath = None,
+        name: str = None,
+        **node_kwargs,
+    ):
+        self.spritesheet = spritesheet
+        self.sprite_sizes = sprite_sizes
+        self.items = items or []
+        # Items of pool, shared by all its nodes
+        self.animation_set = AnimationSet(self.items)
+        self.default_item = default_item
+        self.low_watermark = low_watermark
+        self.high_watermark = max(high_watermark, low_watermark)
+        # Parent of acquired nodes, unless other has been passed to acquire()
+        self.parent = parent or NodePath()
+        self.name = name or spritesheet.get_name() or "SpritesheetNodePool"
+        # Other arguments of SpritesheetNode, used for new nodes
+        self.node_kwargs = node_kwargs
+
+        # Detached node, to which released nodes get reparented
+        self.root = NodePath(f"{self.name} pool")
+        self.free = []
+        # Same nodes as in self.free, to check if node is free without going
+        # through whole list
+        self._free_set = set()
+        # Transform of nodes on creation, restored on release
+        self._transform = None
+        self.stats = PoolStats()
+
+        self.fill()
+
+    def _make_node(self) -> SpritesheetNode:
+        node = SpritesheetNode(
+            spritesheet=self.spritesheet,
+            sprite_sizes=self.sprite_sizes,
+            name=self.name,
+            parent=self.root,
+            animation_set=self.animation_set,
+            **self.node_kwargs,
+        )
+        if self.default_item:
+            node.set_default(self.default_item)
+        if self._transform is None:
+            self._transform = node.node.get_transform()
+        return node
+
+    def fill(self, amount: int = None):
+        """Create new nodes till pool has provided amount of free nodes. If
+        amount isnt set - fill up to low_watermark"""
+        amount = self.low_watermark if amount is None else amount
+        amount = min(amount, self.high_watermark)
+        while len(self.free) < amount:
+            node = self._make_node()
+            node.node.stash()
+            self.free.append(node)
+            self._free_set.add(node)
+
+    def acquire(
+        self, parent: NodePath = None, position: Vec3 = None, item: str = None
+    ) -> SpritesheetNode:
+        """Get node from pool, or create new one if pool is empty. If item (name
+        or id in pool's animation_set) has been passed - node will start playing
+        it right away"""
+        if self.free:
+            node = self.free.pop()
+            self._free_set.discard(node)
+            node.node.unstash()
+            self.stats.hits += 1
+        else:
+            node = self._make_node()
+            self.stats.misses += 1
+
+        node.node.reparent_to(parent or self.parent)
+        if position:
+            node.node.set_pos(*position)
+        if item is not None:
+            node.play(item)
+
+        return node
+
+    def release(self, node: SpritesheetNode):
+        """Return node to pool. Its playback gets stopped and reset to default
+        sprite, its transform is reset to the one it had on creation, and node
+        itself gets removed from scene. Nodes that are already free are ignored"""
+        if node in self._free_set:
+            log.warning("%s has already been released to %s", node.name, self.name)
+            return
+
+        node.stop()
+        self.stats.released += 1
+
+        if len(self.free) >= self.high_watermark:
+            node.destroy()
+            self.stats.destroyed += 1
+            return
+
+        # Undoing changes made to node while it has been in use
+        node.items = self.animation_set.items
+        node._items_shared = True
+        node.default_item = None
+        if self.default_item:
+            node.set_default(self.default_item)
+        node.frame_time_left = 0
+        node.show_sprite(node.default_sprite)
+        node.node.reparent_to(self.root)
+        node.node.set_transform(self._transform)
+        node.node.stash()
+        self.free.append(node)
+        self._free_set.add(node)
+
+    def clear(self):
+        """Destroy all free nodes of this pool"""
+        for node in self.free:
+            node.destroy()
+        self.free = []
+        self._free_set = set()
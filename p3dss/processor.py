@@ -1,15 +1,37 @@
 from . import types, exceptions
-from panda3d.core import Texture, SamplerState, LPoint2
+from panda3d.core import Texture, SamplerState, LPoint2, CPTA_uchar
 from panda3d.core import PNMImage as Image
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 import logging
+import os
 
 log = logging.getLogger(__name__)
 
+# Max amount of offset tables, kept in get_offsets() cache. Least recently used
+# ones get dropped first. Each entry keeps its texture alive (with its RAM image),
+# thus this is kept low
+OFFSETS_CACHE_SIZE = 32
+
+# Offset tables, keyed by (spritesheet, sprite_sizes). Since Texture objects are
+# hashed by identity, reloaded textures will get new entries. Entries hold
+# strong references to their textures - these wont be freed on unload till
+# their entries get evicted or dropped with clear_offsets_cache()
+_offsets_cache = OrderedDict()
+
 
 def _is_power_of_two(num) -> bool:
     return num and not (num & (num - 1))
 
 
+def _next_power_of_two(num: int) -> int:
+    power = 1
+    while power < num:
+        power *= 2
+    return power
+
+
 def _has_remainder(spritesheet: Texture, sprite_sizes: tuple) -> bool:
     return (spritesheet.get_orig_file_x_size() % sprite_sizes[0]) or (
         spritesheet.get_orig_file_y_size() % sprite_sizes[1]
@@ -22,8 +44,57 @@ def _get_columns_and_rows(spritesheet: Texture, sprite_sizes: tuple) -> tuple:
     return (columns, rows)
 
 
-def get_offsets(spritesheet: Texture, sprite_sizes: tuple) -> types.SpritesheetData:
-    """Fetch all available offsets from provided spritesheet."""
+def get_offsets(
+    spritesheet: Texture, sprite_sizes: tuple, use_cache: bool = True
+) -> types.SpritesheetData:
+    """Fetch all available offsets from provided spritesheet.
+
+    Results are cached, thus all callers requesting offsets of the same texture
+    and sprite sizes will share the same data. Its offsets are stored as tuple
+    and should not be modified in place. If texture's content has changed, call
+    clear_offsets_cache() to invalidate its entries.
+
+    Cache keeps references to textures, thus textures wont be freed after being
+    unloaded, till their entries get evicted. Call clear_offsets_cache() with
+    texture you are about to unload, to free it right away.
+    """
+    if not use_cache:
+        return _make_offsets(spritesheet, sprite_sizes)
+
+    return _get_cached(
+        (spritesheet, tuple(sprite_sizes)),
+        lambda: _make_offsets(spritesheet, sprite_sizes),
+    )
+
+
+def _get_cached(key: tuple, maker: callable) -> types.SpritesheetData:
+    """Get data with provided key from offsets cache, or make and cache it"""
+    data = _offsets_cache.get(key)
+    if data is not None:
+        _offsets_cache.move_to_end(key)
+        return data
+
+    data = maker()
+    _offsets_cache[key] = data
+    if len(_offsets_cache) > OFFSETS_CACHE_SIZE:
+        _offsets_cache.popitem(last=False)
+
+    return data
+
+
+def clear_offsets_cache(spritesheet: Texture = None):
+    """Drop cached offsets of provided spritesheet, or whole cache if nothing
+    has been passed"""
+    if spritesheet is None:
+        _offsets_cache.clear()
+        return
+
+    for key in [key for key in _offsets_cache if key[0] == spritesheet]:
+        del _offsets_cache[key]
+
+
+def _make_offsets(spritesheet: Texture, sprite_sizes: tuple) -> types.SpritesheetData:
+    """Calculate offsets of provided spritesheet, bypassing cache"""
 
     # For now, this has 2 limitations, both of which are addressed as exceptions:
     # 1. Spritesheet HAS TO DIVIDE TO PROVIDED SPRITE SIZE WITHOUT REMAINDER. If
@@ -38,7 +109,10 @@ def get_offsets(spritesheet: Texture, sprite_sizes: tuple) -> types.SpritesheetD
     # As for first - I can probably add bool to enable optional cut with PNMimage
     # of all the garbage that dont fit #TODO
 
-    log.debug(f"Fetching {sprite_sizes} offsets from {spritesheet.get_name()}")
+    # Checked once, to avoid formatting per-sprite messages nobody will see
+    debug = log.isEnabledFor(logging.DEBUG)
+    if debug:
+        log.debug("Fetching %s offsets from %s", sprite_sizes, spritesheet.get_name())
 
     # Checking if our spritesheet match first limitation, mentioned above
     if _has_remainder(spritesheet, sprite_sizes):
@@ -51,42 +125,44 @@ def get_offsets(spritesheet: Texture, sprite_sizes: tuple) -> types.SpritesheetD
     if not _is_power_of_two(sprite_columns) or not _is_power_of_two(sprite_rows):
         raise exceptions.InvalidSpriteSize(spritesheet.get_name(), sprite_sizes)
 
-    log.debug(f"Our sheet has {sprite_columns}x{sprite_rows} sprites")
+    if debug:
+        log.debug("Our sheet has %sx%s sprites", sprite_columns, sprite_rows)
 
     # idk if these should be flipped - its 3 am
     # this may backfire on values bigger than one... but it should never happen
     horizontal_offset_step = 1 / sprite_columns
     vertical_offset_step = 1 / sprite_rows
     offset_steps = LPoint2(horizontal_offset_step, vertical_offset_step)
-    log.debug(f"Offset steps are {offset_steps}")
+    if debug:
+        log.debug("Offset steps are %s", offset_steps)
 
     spritesheet_offsets = []
 
     # We process rows backwards to make it match "from top left to bottom right"
     # style of image processing, used by most tools (and thus probs expected)
     for row in range(sprite_rows - 1, -1, -1):
-        log.debug(f"Processing row {row}")
+        if debug:
+            log.debug("Processing row %s", row)
         for column in range(0, sprite_columns):
-            log.debug(f"Processing column {column}")
             horizontal_offset = column * horizontal_offset_step
             vertical_offset = row * vertical_offset_step
             offsets = LPoint2(horizontal_offset, vertical_offset)
-            log.debug(f"Got offsets: {offsets}")
+            if debug:
+                log.debug("Got offsets of column %s: %s", column, offsets)
             spritesheet_offsets.append(offsets)
-    log.debug(f"Spritesheet contain following offsets: {spritesheet_offsets}")
 
-    data = types.SpritesheetData(spritesheet, spritesheet_offsets, offset_steps)
-    log.debug(f"Got following data: {data}, returning")
+    data = types.SpritesheetData(spritesheet, tuple(spritesheet_offsets), offset_steps)
+    if debug:
+        log.debug("Got following data: %s, returning", data)
 
     return data
 
 
-def get_images(spritesheet: Texture, sprite_sizes: tuple) -> list:
-    """Cut provided spritesheet texture into separate PNMImage objects"""
+def _check_cut_sizes(spritesheet: Texture, sprite_sizes: tuple):
+    """Ensure that provided spritesheet can be cut into sprites of provided sizes"""
     if _has_remainder(spritesheet, sprite_sizes):
         raise exceptions.InvalidSpriteSize(spritesheet.get_name(), sprite_sizes)
 
-    sprite_x, sprite_y = sprite_sizes
     columns, rows = _get_columns_and_rows(spritesheet, sprite_sizes)
 
     # This is safety check to ensure there wont be any weird effects during cutting,
@@ -98,43 +174,443 @@ def get_images(spritesheet: Texture, sprite_sizes: tuple) -> list:
         if not _is_power_of_two(columns) or not _is_power_of_two(rows):
             raise exceptions.InvalidSpriteSize(spritesheet.get_name(), sprite_sizes)
 
-    # Extract texture's image from memory
-    sheet_image = Image()
-    spritesheet.store(sheet_image)
 
+def _get_alpha_mask(texture: Texture, alpha_threshold: int = 0) -> bytes:
+    """Get mask of texture's RAM image, with one byte per pixel. Its 1 for pixels
+    with alpha above threshold (from 0 to 255) and 0 for the rest. Just like
+    RAM image itself, mask's rows go from bottom to top"""
+    has_alpha = texture.get_num_components() in (2, 4) or (
+        texture.get_format() == Texture.F_alpha
+    )
+    if not has_alpha:
+        return b"\x01" * (texture.get_x_size() * texture.get_y_size())
+
+    alpha = texture.get_ram_image_as("A").get_data()
+    component_width = texture.get_component_width()
+    if component_width > 1:
+        # Only using most significant byte of each value
+        alpha = alpha[component_width - 1 :: component_width]
+
+    table = bytes(0 if value <= alpha_threshold else 1 for value in range(256))
+    return alpha.translate(table)
+
+
+def _find_trim_rect(
+    mask: bytes, mask_sizes: tuple, x: int, y: int, width: int, height: int
+) -> types.TrimRect:
+    """Find non-transparent area of provided part of image, using mask made by
+    _get_alpha_mask(). Coordinates are relative to image's top left corner"""
+    mask_x, mask_y = mask_sizes
+    top = bottom = None
+    left = width
+    right = -1
+    for line in range(height):
+        start = (mask_y - 1 - y - line) * mask_x + x
+        segment = mask[start : start + width]
+        first = segment.find(1)
+        if first < 0:
+            continue
+        if top is None:
+            top = line
+        bottom = line
+        left = min(left, first)
+        right = max(right, segment.rfind(1))
+
+    if top is None:
+        return types.TrimRect(0, 0, 0, 0)
+
+    return types.TrimRect(left, top, right - left + 1, bottom - top + 1)
+
+
+def get_trim_rects(
+    spritesheet: Texture, sprite_sizes: tuple, alpha_threshold: int = 0
+) -> list:
+    """Get TrimRect of each sprite on spritesheet, in the same order as
+    get_offsets(). Fully transparent sprites get rects of zero size"""
+    _check_cut_sizes(spritesheet, sprite_sizes)
+    columns, rows = _get_columns_and_rows(spritesheet, sprite_sizes)
+    sprite_x, sprite_y = sprite_sizes
+    mask = _get_alpha_mask(spritesheet, alpha_threshold)
+    mask_sizes = (spritesheet.get_x_size(), spritesheet.get_y_size())
+
+    return [
+        _find_trim_rect(
+            mask,
+            mask_sizes,
+            column * sprite_x,
+            row * sprite_y,
+            sprite_x,
+            sprite_y,
+        )
+        for row in range(rows)
+        for column in range(columns)
+    ]
+
+
+def get_trimmed_offsets(
+    spritesheet: Texture, sprite_sizes: tuple, alpha_threshold: int = 0
+) -> types.SpritesheetData:
+    """Same as get_offsets(), but with offsets and scales limited to
+    non-transparent area of each sprite, and frames specifying which part of
+    node's card it should cover. Results are cached too"""
+    return _get_cached(
+        (spritesheet, tuple(sprite_sizes), "trimmed", alpha_threshold),
+        lambda: _make_trimmed_offsets(spritesheet, sprite_sizes, alpha_threshold),
+    )
+
+
+def _make_trimmed_offsets(
+    spritesheet: Texture, sprite_sizes: tuple, alpha_threshold: int
+) -> types.SpritesheetData:
+    data = get_offsets(spritesheet, sprite_sizes)
+    step_x, step_y = data.step_sizes
+    sprite_x, sprite_y = sprite_sizes
+
+    offsets = []
+    scales = []
+    frames = []
+    for offset, rect in zip(
+        data.offsets, get_trim_rects(spritesheet, sprite_sizes, alpha_threshold)
+    ):
+        left = rect.x / sprite_x
+        right = (rect.x + rect.width) / sprite_x
+        # Textures count v from bottom, unlike images
+        bottom = 1 - (rect.y + rect.height) / sprite_y
+        top = 1 - rect.y / sprite_y
+        offsets.append(LPoint2(offset[0] + left * step_x, offset[1] + bottom * step_y))
+        scales.append(LPoint2((right - left) * step_x, (top - bottom) * step_y))
+        frames.append((left, right, bottom, top))
+
+    return types.SpritesheetData(
+        spritesheet, tuple(offsets), data.step_sizes, tuple(scales), tuple(frames)
+    )
+
+
+def _cut_rows(
+    sheet_image: Image, sprite_sizes: tuple, columns: int, rows: range
+) -> list:
+    """Cut sprites out of provided rows of sheet image"""
+    sprite_x, sprite_y = sprite_sizes
+    channels = sheet_image.get_num_channels()
+
+    debug = log.isEnabledFor(logging.DEBUG)
     images = []
-    for row in range(0, rows):
-        log.debug(f"Processing row{row}")
+    for row in rows:
+        if debug:
+            log.debug("Processing row %s", row)
         for column in range(0, columns):
-            log.debug(f"Processing column {column}")
             # THIS WAS BUGGED - I HAD TO FLIP IT
             x = column * sprite_x
             y = row * sprite_y
-            # passing amount of channels is important to allow transparency
-            pic = Image(sprite_x, sprite_y, sheet_image.get_num_channels())
-            pic.blendSubImage(sheet_image, 0, 0, x, y, sprite_x, sprite_y, 1.0)
+            # passing amount of channels is important to allow transparency.
+            # Plain copy is enough there - sprite starts empty, thus there is
+            # nothing to blend with
+            pic = Image(sprite_x, sprite_y, channels)
+            pic.copy_sub_image(sheet_image, 0, 0, x, y, sprite_x, sprite_y)
             images.append(pic)
 
-    log.debug(f"Got following images: {images}")
     return images
 
 
+def _cut_ram_rows(
+    pixels: memoryview,
+    sheet_sizes: tuple,
+    pixel_size: int,
+    sprite_sizes: tuple,
+    rows: range,
+) -> list:
+    """Cut sprites out of provided rows of raw RAM image. Returns RAM image of
+    each sprite as bytes"""
+    sheet_x, sheet_y = sheet_sizes
+    sprite_x, sprite_y = sprite_sizes
+    row_size = sheet_x * pixel_size
+    line_size = sprite_x * pixel_size
+
+    sprites = []
+    for row in rows:
+        # RAM images are stored from bottom to top, unlike PNMImage
+        bottom = sheet_y - (row + 1) * sprite_y
+        for column in range(0, sheet_x // sprite_x):
+            x = column * sprite_x * pixel_size
+            sprites.append(
+                b"".join(
+                    pixels[line * row_size + x : line * row_size + x + line_size]
+                    for line in range(bottom, bottom + sprite_y)
+                )
+            )
+
+    return sprites
+
+
+def _cut_shared_rows(
+    memory_name: str,
+    sheet_sizes: tuple,
+    pixel_size: int,
+    sprite_sizes: tuple,
+    rows: range,
+) -> list:
+    """Same as _cut_ram_rows(), but for RAM image stored in shared memory.
+    Meant to be ran in worker process"""
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        return _cut_ram_rows(memory.buf, sheet_sizes, pixel_size, sprite_sizes, rows)
+    finally:
+        memory.close()
+
+
+def _split_rows(rows: int, bands: int) -> list:
+    """Split provided amount of rows into up to provided amount of bands"""
+    bands = max(1, min(bands, rows))
+    band_size, remainder = divmod(rows, bands)
+    ranges = []
+    start = 0
+    for band in range(bands):
+        end = start + band_size + (1 if band < remainder else 0)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+
+def _cut_in_processes(
+    spritesheet: Texture, sprite_sizes: tuple, executor: Executor, bands: int
+) -> tuple:
+    """Cut spritesheet with process pool. Returns RAM images of sprites and
+    amount of channels in them"""
+    sheet_sizes = (spritesheet.get_x_size(), spritesheet.get_y_size())
+    channels = spritesheet.get_num_components()
+    pixel_size = channels * spritesheet.get_component_width()
+    ram_image = memoryview(spritesheet.get_uncompressed_ram_image())
+
+    memory = shared_memory.SharedMemory(create=True, size=ram_image.nbytes)
+    try:
+        memory.buf[: ram_image.nbytes] = ram_image
+        rows = sheet_sizes[1] // sprite_sizes[1]
+        futures = [
+            executor.submit(
+                _cut_shared_rows,
+                memory.name,
+                sheet_sizes,
+                pixel_size,
+                tuple(sprite_sizes),
+                band,
+            )
+            for band in _split_rows(rows, bands)
+        ]
+        sprites = [sprite for future in futures for sprite in future.result()]
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return sprites, channels
+
+
+def _get_format(channels: int) -> int:
+    return {
+        1: Texture.F_luminance,
+        2: Texture.F_luminance_alpha,
+        3: Texture.F_rgb,
+    }.get(channels, Texture.F_rgba)
+
+
+def _ram_to_texture(
+    data: bytes, sprite_sizes: tuple, channels: int, component_type, name: str
+) -> Texture:
+    texture = Texture(name)
+    texture.setup_2d_texture(
+        sprite_sizes[0], sprite_sizes[1], component_type, _get_format(channels)
+    )
+    texture.set_ram_image(data)
+    return texture
+
+
+def get_images(spritesheet: Texture, sprite_sizes: tuple) -> list:
+    """Cut provided spritesheet texture into separate PNMImage objects"""
+    _check_cut_sizes(spritesheet, sprite_sizes)
+    columns, rows = _get_columns_and_rows(spritesheet, sprite_sizes)
+
+    # Extract texture's image from memory
+    sheet_image = Image()
+    spritesheet.store(sheet_image)
+
+    images = _cut_rows(sheet_image, sprite_sizes, columns, range(0, rows))
+
+    log.debug("Got %s images", len(images))
+    return images
+
+
+def get_images_parallel(
+    spritesheet: Texture,
+    sprite_sizes: tuple,
+    executor: Executor = None,
+    bands: int = None,
+) -> list:
+    """Same as get_images(), but cuts spritesheet in multiple row bands at once.
+
+    By default, ThreadPoolExecutor with one worker per cpu core is used. If
+    ProcessPoolExecutor has been passed, spritesheet's pixels are shared with
+    worker processes via shared memory instead of being copied to each of them.
+    Order of returned images is the same as with get_images().
+    """
+    _check_cut_sizes(spritesheet, sprite_sizes)
+    bands = bands or (os.cpu_count() or 1) * 2
+
+    if isinstance(executor, ProcessPoolExecutor):
+        sprites, channels = _cut_in_processes(
+            spritesheet, sprite_sizes, executor, bands
+        )
+        images = []
+        for data in sprites:
+            image = Image()
+            _ram_to_texture(
+                data, sprite_sizes, channels, spritesheet.get_component_type(), ""
+            ).store(image)
+            images.append(image)
+        return images
+
+    columns, rows = _get_columns_and_rows(spritesheet, sprite_sizes)
+    sheet_image = Image()
+    spritesheet.store(sheet_image)
+
+    own_executor = executor is None
+    executor = executor or ThreadPoolExecutor(os.cpu_count())
+    try:
+        futures = [
+            executor.submit(_cut_rows, sheet_image, sprite_sizes, columns, band)
+            for band in _split_rows(rows, bands)
+        ]
+        images = [image for future in futures for image in future.result()]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    log.debug("Got %s images", len(images))
+    return images
+
+
+# Bytes per pixel of formats, whose size doesnt match amount of components
+_FORMAT_SIZES = {
+    Texture.F_rgba4: 2,
+    Texture.F_rgba5: 2,
+    Texture.F_rgb5: 2,
+    Texture.F_rgb332: 1,
+}
+
+# Bytes per pixel of block compressed textures
+_COMPRESSION_SIZES = {
+    Texture.CM_dxt1: 0.5,
+    Texture.CM_dxt3: 1,
+    Texture.CM_dxt5: 1,
+}
+
+
+def _apply_format(texture: Texture, texture_format: types.TextureFormat):
+    """Switch texture to format of provided kind, depending on channels its
+    image actually uses"""
+    if texture_format == types.TextureFormat.full:
+        return
+    if texture.get_component_width() != 1:
+        # Only 8-bit images can be checked and reduced for now
+        return
+
+    components = texture.get_num_components()
+    data = bytes(texture.get_uncompressed_ram_image())
+    # RAM images are stored as BGR(A) or L(A), with alpha being the last one
+    alpha = data[components - 1 :: components] if components in (2, 4) else b""
+    if alpha and not alpha.translate(None, b"\xff"):
+        # Alpha is always opaque, thus not needed
+        alpha = b""
+    binary_alpha = not alpha.translate(None, b"\x00\xff")
+    gray = components < 3 or (
+        data[0::components] == data[1::components] == data[2::components]
+        # Compressed formats are made for colored images
+        and texture_format != types.TextureFormat.compressed
+    )
+
+    channels = (1 if gray else 3) + (1 if alpha else 0)
+    if channels != components:
+        pixels = bytearray(len(data) // components * channels)
+        for channel in range(1 if gray else 3):
+            pixels[channel::channels] = data[channel::components]
+        if alpha:
+            pixels[channels - 1 :: channels] = alpha
+        texture.setup_2d_texture(
+            texture.get_x_size(),
+            texture.get_y_size(),
+            texture.get_component_type(),
+            _get_format(channels),
+        )
+        texture.set_ram_image(bytes(pixels))
+
+    if texture_format == types.TextureFormat.reduced and not gray:
+        if not alpha:
+            texture.set_format(Texture.F_rgb5)
+        elif binary_alpha:
+            texture.set_format(Texture.F_rgba5)
+        else:
+            texture.set_format(Texture.F_rgba4)
+    elif texture_format == types.TextureFormat.compressed:
+        compression = Texture.CM_dxt1 if binary_alpha else Texture.CM_dxt5
+        texture.set_compression(compression)
+        # Compressing RAM image right away also reduces upload size. If
+        # Panda3D has been built without squish, driver will do it on upload
+        texture.compress_ram_image(compression)
+
+
+def get_texture_memory(textures: list) -> types.TextureMemory:
+    """Estimate video memory used by top mipmap level of provided textures, as
+    uncompressed RGBA and with their actual formats. Textures that are passed
+    multiple times (e.g sprites of get_unique_textures()) are only counted once"""
+    full = actual = 0
+    for texture in {id(texture): texture for texture in textures}.values():
+        pixels = texture.get_x_size() * texture.get_y_size() * texture.get_z_size()
+        full += pixels * 4
+        pixel_size = _COMPRESSION_SIZES.get(texture.get_compression())
+        if pixel_size is None:
+            pixel_size = _FORMAT_SIZES.get(
+                texture.get_format(),
+                texture.get_num_components() * texture.get_component_width(),
+            )
+        actual += int(pixels * pixel_size)
+
+    return types.TextureMemory(full, actual)
+
+
+def _log_texture_memory(textures: list, texture_format: types.TextureFormat):
+    if texture_format == types.TextureFormat.full or not log.isEnabledFor(
+        logging.DEBUG
+    ):
+        return
+    memory = get_texture_memory(textures)
+    log.debug(
+        "%s format saved %s of %s bytes of texture memory",
+        texture_format.name,
+        memory.full - memory.actual,
+        memory.full,
+    )
+
+
 def to_textures(
     images: list,
     name_mask: str = None,
     image_sizes: LPoint2 = None,
     texture_filter: SamplerState = None,
+    first_num: int = 0,
+    texture_format: types.TextureFormat = types.TextureFormat.full,
 ) -> list:
-    """Convert provided list of PNMImage objects into Texture objects"""
+    """Convert provided list of PNMImage objects into Texture objects. Textures
+    are numbered starting from first_num. With texture_format other than full,
+    each texture gets its own format, based on channels of its image - use
+    get_texture_memory() to see how much memory it has saved"""
     # doing it like that to enable ez override in get_textures()
     name_mask = name_mask or "sprite"
     textures = []
 
     # without name mask, this may seem like it returns empty sequence, but its not
-    for num, item in enumerate(images):
+    for num, item in enumerate(images, first_num):
         # this is how we turn image into texture
         texture = Texture(f"{name_mask}_{num}")
         texture.load(item)
+        _apply_format(texture, texture_format)
         if texture_filter is not None:
             texture.set_magfilter(texture_filter)
             texture.set_minfilter(texture_filter)
@@ -142,12 +618,16 @@ def to_textures(
             texture.set_orig_file_size(*image_sizes, 1)
         textures.append(texture)
 
-    log.debug(f"Got following textures: {textures}")
+    log.debug("Got %s textures", len(textures))
+    _log_texture_memory(textures, texture_format)
     return textures
 
 
 def get_textures(
-    spritesheet: Texture, sprite_sizes: tuple, texture_filter: SamplerState = None
+    spritesheet: Texture,
+    sprite_sizes: tuple,
+    texture_filter: SamplerState = None,
+    texture_format: types.TextureFormat = types.TextureFormat.full,
 ) -> list:
     """Cut provided spritesheet texture into multiple textures"""
     images = get_images(
@@ -160,4 +640,330 @@ def get_textures(
     if texture_filter is None:
         texture_filter = spritesheet.get_magfilter()
 
-    return to_textures(images, spritesheet.get_name(), sprite_sizes, texture_filter)
+    return to_textures(
+        images,
+        spritesheet.get_name(),
+        sprite_sizes,
+        texture_filter,
+        texture_format=texture_format,
+    )
+
+
+def get_textures_parallel(
+    spritesheet: Texture,
+    sprite_sizes: tuple,
+    texture_filter: SamplerState = None,
+    executor: Executor = None,
+    bands: int = None,
+    texture_format: types.TextureFormat = types.TextureFormat.full,
+) -> list:
+    """Same as get_textures(), but cuts spritesheet with get_images_parallel()"""
+    if texture_filter is None:
+        texture_filter = spritesheet.get_magfilter()
+
+    if not isinstance(executor, ProcessPoolExecutor):
+        images = get_images_parallel(spritesheet, sprite_sizes, executor, bands)
+        return to_textures(
+            images,
+            spritesheet.get_name(),
+            sprite_sizes,
+            texture_filter,
+            texture_format=texture_format,
+        )
+
+    # With processes, we already get RAM images - thus there is no need to make
+    # PNMImage objects out of them
+    _check_cut_sizes(spritesheet, sprite_sizes)
+    sprites, channels = _cut_in_processes(
+        spritesheet, sprite_sizes, executor, bands or (os.cpu_count() or 1) * 2
+    )
+    name_mask = spritesheet.get_name() or "sprite"
+    textures = []
+    for num, data in enumerate(sprites):
+        texture = _ram_to_texture(
+            data,
+            sprite_sizes,
+            channels,
+            spritesheet.get_component_type(),
+            f"{name_mask}_{num}",
+        )
+        _apply_format(texture, texture_format)
+        texture.set_magfilter(texture_filter)
+        texture.set_minfilter(texture_filter)
+        texture.set_orig_file_size(*sprite_sizes, 1)
+        textures.append(texture)
+
+    _log_texture_memory(textures, texture_format)
+    return textures
+
+
+def _get_unique_cells(spritesheet: Texture, sprite_sizes: tuple) -> tuple:
+    """Get RAM images of unique sprites on spritesheet, number of first cell
+    with each of them, and index of unique sprite for each cell"""
+    _check_cut_sizes(spritesheet, sprite_sizes)
+    pixel_size = spritesheet.get_num_components() * spritesheet.get_component_width()
+    cells = _cut_ram_rows(
+        memoryview(spritesheet.get_uncompressed_ram_image()),
+        (spritesheet.get_x_size(), spritesheet.get_y_size()),
+        pixel_size,
+        sprite_sizes,
+        range(0, spritesheet.get_y_size() // sprite_sizes[1]),
+    )
+
+    # Using content itself as key, thus there is no chance of hash collisions
+    indexes = {}
+    unique = []
+    first_cells = []
+    index_map = []
+    for num, cell in enumerate(cells):
+        index = indexes.get(cell)
+        if index is None:
+            index = indexes[cell] = len(unique)
+            unique.append(cell)
+            first_cells.append(num)
+        index_map.append(index)
+
+    log.debug("Found %s unique sprites out of %s", len(unique), len(cells))
+    return unique, first_cells, tuple(index_map)
+
+
+def get_unique_images(spritesheet: Texture, sprite_sizes: tuple) -> types.UniqueSprites:
+    """Same as get_images(), but identical sprites are only cut once. Cells
+    with the same content share the same PNMImage object"""
+    unique, first_cells, index_map = _get_unique_cells(spritesheet, sprite_sizes)
+
+    images = []
+    for data in unique:
+        image = Image()
+        _ram_to_texture(
+            data,
+            sprite_sizes,
+            spritesheet.get_num_components(),
+            spritesheet.get_component_type(),
+            "",
+        ).store(image)
+        images.append(image)
+
+    return types.UniqueSprites(
+        [images[index] for index in index_map], images, index_map
+    )
+
+
+def get_unique_textures(
+    spritesheet: Texture,
+    sprite_sizes: tuple,
+    texture_filter: SamplerState = None,
+    texture_format: types.TextureFormat = types.TextureFormat.full,
+) -> types.UniqueSprites:
+    """Same as get_textures(), but identical sprites are only turned into texture
+    once. Cells with the same content share the same Texture object, named after
+    the first of these cells"""
+    unique, first_cells, index_map = _get_unique_cells(spritesheet, sprite_sizes)
+    if texture_filter is None:
+        texture_filter = spritesheet.get_magfilter()
+
+    name_mask = spritesheet.get_name() or "sprite"
+    textures = []
+    for data, num in zip(unique, first_cells):
+        texture = _ram_to_texture(
+            data,
+            sprite_sizes,
+            spritesheet.get_num_components(),
+            spritesheet.get_component_type(),
+            f"{name_mask}_{num}",
+        )
+        _apply_format(texture, texture_format)
+        texture.set_magfilter(texture_filter)
+        texture.set_minfilter(texture_filter)
+        texture.set_orig_file_size(*sprite_sizes, 1)
+        textures.append(texture)
+
+    _log_texture_memory(textures, texture_format)
+    return types.UniqueSprites(
+        [textures[index] for index in index_map], textures, index_map
+    )
+
+
+def _get_mipmap_filter(texture_filter: SamplerState) -> SamplerState:
+    if texture_filter == SamplerState.FT_nearest:
+        return SamplerState.FT_nearest_mipmap_nearest
+    return SamplerState.FT_linear_mipmap_linear
+
+
+def _extrude_cell(
+    data: bytes,
+    sprite_sizes: tuple,
+    pixel_size: int,
+    slot_sizes: tuple,
+    left: int,
+    bottom: int,
+) -> bytes:
+    """Place RAM image of sprite into bigger slot, filling the rest of it with
+    copies of sprite's edge pixels. Sprite's bottom left corner is placed at
+    (left, bottom) pixel of slot"""
+    sprite_x, sprite_y = sprite_sizes
+    right = slot_sizes[0] - sprite_x - left
+    top = slot_sizes[1] - sprite_y - bottom
+    line_size = sprite_x * pixel_size
+
+    lines = []
+    for start in range(0, sprite_y * line_size, line_size):
+        line = data[start : start + line_size]
+        lines.append(
+            line[:pixel_size] * left + line + line[line_size - pixel_size :] * right
+        )
+    # RAM images are stored from bottom to top
+    return b"".join([lines[0]] * bottom + lines + [lines[-1]] * top)
+
+
+def get_padded_sheet(
+    spritesheet: Texture,
+    sprite_sizes: tuple,
+    padding: int = 2,
+    mip_levels: int = 3,
+    texture_filter: SamplerState = None,
+    mipmaps: bool = True,
+) -> types.SpritesheetData:
+    """Rebuild spritesheet with edge pixels of each sprite extruded by at least
+    padding pixels, to avoid neighbour sprites bleeding in on filtering.
+
+    Returns SpritesheetData of new sheet, which can be passed as sprite_data to
+    SpritesheetNode, SpritesheetBatch or SpritesheetTilemap. Cells of new sheet
+    are aligned to 2 ** mip_levels pixels, thus first mip_levels mipmap levels
+    get generated from each cell separately. Smaller levels (if mipmaps are
+    enabled) will mix neighbour sprites, just like on original sheet. New sheet
+    is power of two sized, regardless of amount of sprites in its rows.
+    """
+    _check_cut_sizes(spritesheet, sprite_sizes)
+    columns, rows = _get_columns_and_rows(spritesheet, sprite_sizes)
+    sprite_x, sprite_y = sprite_sizes
+    channels = spritesheet.get_num_components()
+    pixel_size = channels * spritesheet.get_component_width()
+    cells = _cut_ram_rows(
+        memoryview(spritesheet.get_uncompressed_ram_image()),
+        (spritesheet.get_x_size(), spritesheet.get_y_size()),
+        pixel_size,
+        sprite_sizes,
+        range(0, rows),
+    )
+
+    alignment = 2**mip_levels
+    slot_x = -(-(sprite_x + padding * 2) // alignment) * alignment
+    slot_y = -(-(sprite_y + padding * 2) // alignment) * alignment
+    # Leftovers of alignment are split between both sides of sprite
+    left = (slot_x - sprite_x) // 2
+    bottom = (slot_y - sprite_y) // 2
+    sheet_x = _next_power_of_two(columns * slot_x)
+    sheet_y = _next_power_of_two(rows * slot_y)
+    slot_line = slot_x * pixel_size
+
+    image = bytearray(sheet_x * sheet_y * pixel_size)
+    offsets = []
+    for num, cell in enumerate(cells):
+        row, column = divmod(num, columns)
+        cell = _extrude_cell(
+            cell, sprite_sizes, pixel_size, (slot_x, slot_y), left, bottom
+        )
+        # Placing cells from top left corner, same as on original sheet
+        cell_y = sheet_y - (row + 1) * slot_y
+        cell_x = column * slot_x
+        for line in range(slot_y):
+            start = ((cell_y + line) * sheet_x + cell_x) * pixel_size
+            image[start : start + slot_line] = cell[
+                line * slot_line : (line + 1) * slot_line
+            ]
+        offsets.append(LPoint2((cell_x + left) / sheet_x, (cell_y + bottom) / sheet_y))
+
+    texture = Texture(f"{spritesheet.get_name()}_padded")
+    texture.setup_2d_texture(
+        sheet_x,
+        sheet_y,
+        spritesheet.get_component_type(),
+        _get_format(channels),
+    )
+    texture.set_ram_image(bytes(image))
+    texture.set_orig_file_size(sheet_x, sheet_y, 1)
+
+    if texture_filter is None:
+        texture_filter = spritesheet.get_magfilter()
+    texture.set_magfilter(texture_filter)
+    if mipmaps:
+        # Panda3D averages 2x2 pixel blocks for each level, thus as long as
+        # cells stay aligned to them - sprites dont get mixed
+        texture.generate_ram_mipmap_images()
+        texture.set_minfilter(_get_mipmap_filter(texture_filter))
+    else:
+        texture.set_minfilter(texture_filter)
+    texture.set_wrap_u(Texture.WM_clamp)
+    texture.set_wrap_v(Texture.WM_clamp)
+
+    log.debug(
+        "Rebuilt %s into %sx%s padded sheet", spritesheet.get_name(), sheet_x, sheet_y
+    )
+    return types.SpritesheetData(
+        texture, tuple(offsets), LPoint2(sprite_x / sheet_x, sprite_y / sheet_y)
+    )
+
+
+def get_texture_array(
+    spritesheet: Texture,
+    sprite_sizes: tuple,
+    texture_filter: SamplerState = None,
+    mipmaps: bool = True,
+) -> Texture:
+    """Cut provided spritesheet into 2D texture array, with one layer per
+    sprite (in the same order as get_offsets()). Since layers are separate,
+    sprites never bleed into each other, even on the smallest mipmap levels.
+    Sampling it requires shader - see shaders.get_array_sprite_shader()"""
+    _check_cut_sizes(spritesheet, sprite_sizes)
+    channels = spritesheet.get_num_components()
+    component_type = spritesheet.get_component_type()
+    pixel_size = channels * spritesheet.get_component_width()
+    cells = _cut_ram_rows(
+        memoryview(spritesheet.get_uncompressed_ram_image()),
+        (spritesheet.get_x_size(), spritesheet.get_y_size()),
+        pixel_size,
+        sprite_sizes,
+        range(0, spritesheet.get_y_size() // sprite_sizes[1]),
+    )
+
+    texture = Texture(f"{spritesheet.get_name()}_array")
+    texture.setup_2d_texture_array(
+        sprite_sizes[0],
+        sprite_sizes[1],
+        len(cells),
+        component_type,
+        _get_format(channels),
+    )
+    texture.set_ram_image(b"".join(cells))
+
+    if texture_filter is None:
+        texture_filter = spritesheet.get_magfilter()
+    texture.set_magfilter(texture_filter)
+    if mipmaps:
+        # generate_ram_mipmap_images() asserts on texture arrays, thus layers
+        # get their mipmaps generated one by one and then joined per level
+        layers = []
+        for cell in cells:
+            layer = _ram_to_texture(cell, sprite_sizes, channels, component_type, "")
+            layer.generate_ram_mipmap_images()
+            layers.append(layer)
+        for level in range(1, layers[0].get_num_ram_mipmap_images()):
+            texture.set_ram_mipmap_image(
+                level,
+                CPTA_uchar(
+                    b"".join(
+                        bytes(layer.get_ram_mipmap_image(level)) for layer in layers
+                    )
+                ),
+            )
+        texture.set_minfilter(_get_mipmap_filter(texture_filter))
+    else:
+        texture.set_minfilter(texture_filter)
+    texture.set_wrap_u(Texture.WM_clamp)
+    texture.set_wrap_v(Texture.WM_clamp)
+
+    log.debug(
+        "Cut %s into texture array of %s sprites", spritesheet.get_name(), len(cells)
+    )
+    return texture
@@ -0,0 +1,158 @@
+import logging
+import time
+from panda3d.core import PythonTask
+from . import types
+from .stats import AnimationStats
+
+log = logging.getLogger(__name__)
+
+_default_scheduler = None
+
+
+class AnimationScheduler:
+    """Single taskmanager routine that advances playback of all registered nodes.
+
+    Nodes register themselves on creation and notify scheduler each time their
+    playback starts or ends. Only nodes with ongoing playback get updated, thus
+    stopped and paused nodes cost nothing per frame.
+
+    By default, TimingMode.frame is used - nodes switch at most one sprite per
+    update, same as before timing modes were introduced. If update_rate is set,
+    nodes get advanced at most this many times per second (e.g 20 for distant
+    actors), instead of each frame. This only makes sense with
+    TimingMode.elapsed, which keeps animations in sync regardless of it.
+    """
+
+    def __init__(
+        self,
+        task_mgr=None,
+        name: str = None,
+        sort: int = 0,
+        timing: types.TimingMode = types.TimingMode.frame,
+        update_rate: float = None,
+    ):
+        self.task_mgr = task_mgr
+        self.name = name or "p3dss animation scheduler"
+        self.sort = sort
+        self.timing = timing
+        # Minimal time between updates. If not set - nodes get updated each frame
+        self.update_interval = 1 / update_rate if update_rate else 0.0
+        # Time that has passed since last update
+        self.time_passed = 0.0
+        # All nodes that use this scheduler
+        self.nodes = set()
+        # Nodes that are playing something right now. This is a dict instead of
+        # set, to keep order of updates stable between frames
+        self.active = {}
+        self.task = None
+        # AnimationStats, if instrumentation has been enabled
+        self.stats = None
+
+    def register(self, node):
+        """Add provided node to scheduler. Its playback wont advance until it
+        has been activated"""
+        self.nodes.add(node)
+        if self.task is None:
+            self.start()
+
+    def unregister(self, node):
+        """Remove provided node from scheduler. Meant to be used on node's
+        destruction"""
+        self.deactivate(node)
+        self.nodes.discard(node)
+        if not self.nodes:
+            self.stop()
+
+    def activate(self, node):
+        """Make scheduler advance playback of provided node each frame"""
+        self.active[node] = None
+
+    def deactivate(self, node):
+        """Make scheduler skip provided node till it gets activated again"""
+        self.active.pop(node, None)
+
+    def update(self, dt: float):
+        """Advance playback of all active nodes by provided delta time"""
+        # Iterating over copy, since nodes may (de)activate during update
+        for node in tuple(self.active):
+            node.update(dt)
+
+    def start(self):
+        """Start taskmanager routine of this scheduler"""
+        if self.task is not None:
+            return
+
+        task_mgr = self.task_mgr or base.task_mgr
+        self.task = task_mgr.add(self._update_task, self.name, sort=self.sort)
+
+    def stop(self):
+        """Stop taskmanager routine of this scheduler"""
+        if self.task is None:
+            return
+
+        self.task.remove()
+        self.task = None
+
+    def enable_stats(self, use_pstats: bool = False) -> AnimationStats:
+        """Start recording per-frame stats of this scheduler and its nodes.
+        Returns AnimationStats object that holds them"""
+        if self.stats is None:
+            self.stats = AnimationStats(use_pstats)
+        else:
+            self.stats.use_pstats = use_pstats
+        return self.stats
+
+    def disable_stats(self):
+        """Stop recording stats"""
+        self.stats = None
+
+    def _get_advanced_count(self, active: int) -> int:
+        """Get amount of nodes advanced by last update(), out of provided amount
+        of nodes that have been active before it. Used by stats"""
+        return active
+
+    def _update_task(self, event: PythonTask) -> PythonTask:
+        """Taskmanager routine that advances all active nodes"""
+        dt = globalClock.get_dt()
+        if self.update_interval:
+            self.time_passed += dt
+            if self.time_passed < self.update_interval:
+                dt = None
+            else:
+                dt = self.time_passed
+                self.time_passed = 0.0
+
+        stats = self.stats
+        if stats is None:
+            if self.active and dt is not None:
+                self.update(dt)
+            return event.cont
+
+        if self.active and dt is not None:
+            active = len(self.active)
+            if stats.use_pstats:
+                collector = stats.get_tick_collector()
+                collector.start()
+            start = time.perf_counter()
+            self.update(dt)
+            stats.tick_time += time.perf_counter() - start
+            if stats.use_pstats:
+                collector.stop()
+            stats.nodes_advanced += self._get_advanced_count(active)
+        stats.end_frame()
+        return event.cont
+
+
+def get_default_scheduler() -> AnimationScheduler:
+    """Get scheduler used by nodes that didnt receive one explicitly"""
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = AnimationScheduler()
+    return _default_scheduler
+
+
+def set_default_scheduler(scheduler: AnimationScheduler):
+    """Replace scheduler used by nodes that didnt receive one explicitly.
+    Nodes that have already been created will keep using the old one"""
+    global _default_scheduler
+    _default_scheduler = scheduler
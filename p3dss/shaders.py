@@ -0,0 +1,129 @@
+import logging
+from panda3d.core import GraphicsStateGuardianBase, Shader
+
+log = logging.getLogger(__name__)
+
+# Max amount of sprites in item that can be played by shader. Its limited by
+# size of uniform array, declared in VERTEX_SHADER below
+MAX_SHADER_FRAMES = 64
+
+# Shader that calculates offset of currently shown sprite on its own, based on
+# global frame time. This way, python code only needs to update its inputs on
+# play() and stop() calls.
+# Frame selection matches the one of SpritesheetNode.update(): first sprite of
+# item is shown once "playback_speed" seconds have passed since start, and until
+# then the previously shown sprite (p3dss_initial) stays on screen
+VERTEX_SHADER = """#version 120
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform float osg_FrameTime;
+
+uniform vec2 p3dss_step;
+uniform vec2 p3dss_initial;
+uniform vec2 p3dss_frames[64];
+// x is start time, y is playback speed, z is amount of frames, w is loop flag
+uniform vec4 p3dss_animation;
+
+attribute vec4 p3d_Vertex;
+attribute vec2 p3d_MultiTexCoord0;
+
+varying vec2 texcoord;
+
+void main() {
+    gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;
+
+    vec2 offset = p3dss_initial;
+    int count = int(p3dss_animation.z);
+    if (count > 0) {
+        float elapsed = osg_FrameTime - p3dss_animation.x;
+        int step = int(floor(elapsed / p3dss_animation.y));
+        if (step > 0) {
+            int frame = step - 1;
+            if (p3dss_animation.w > 0.5) {
+                frame = int(mod(float(frame), float(count)));
+            } else {
+                frame = min(frame, count - 1);
+            }
+            offset = p3dss_frames[frame];
+        }
+    }
+    texcoord = p3d_MultiTexCoord0 * p3dss_step + offset;
+}
+"""
+
+FRAGMENT_SHADER = """#version 120
+
+uniform sampler2D p3d_Texture0;
+uniform vec4 p3d_ColorScale;
+
+varying vec2 texcoord;
+
+void main() {
+    gl_FragColor = texture2D(p3d_Texture0, texcoord) * p3d_ColorScale;
+}
+"""
+
+_sprite_shader = None
+
+
+def is_supported() -> bool:
+    """Check if sprite shader can be used. This isnt possible till window (or
+    offscreen buffer) has been opened, and with renderers that dont support
+    shaders (e.g p3tinydisplay)"""
+    gsg = GraphicsStateGuardianBase.get_default_gsg()
+    return gsg is not None and gsg.get_supports_basic_shaders()
+
+
+def get_sprite_shader() -> Shader:
+    """Get shader used by SpritesheetNode with use_shader enabled. Its shared
+    between all nodes, thus only gets compiled once"""
+    global _sprite_shader
+    if _sprite_shader is None:
+        _sprite_shader = Shader.make(Shader.SL_GLSL, VERTEX_SHADER, FRAGMENT_SHADER)
+    return _sprite_shader
+
+
+# Shader for cards textured with 2D texture array (see
+# processor.get_texture_array()). Shown sprite is selected with "p3dss_layer"
+# input, e.g node.set_shader_input("p3dss_layer", 3). Requires OpenGL 3.0+
+ARRAY_VERTEX_SHADER = """#version 130
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+
+in vec4 p3d_Vertex;
+in vec2 p3d_MultiTexCoord0;
+
+out vec2 texcoord;
+
+void main() {
+    gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;
+    texcoord = p3d_MultiTexCoord0;
+}
+"""
+
+ARRAY_FRAGMENT_SHADER = """#version 130
+
+uniform sampler2DArray p3d_Texture0;
+uniform vec4 p3d_ColorScale;
+uniform float p3dss_layer;
+
+in vec2 texcoord;
+
+out vec4 p3d_FragColor;
+
+void main() {
+    p3d_FragColor = texture(p3d_Texture0, vec3(texcoord, p3dss_layer)) * p3d_ColorScale;
+}
+"""
+
+_array_sprite_shader = None
+
+
+def get_array_sprite_shader() -> Shader:
+    """Get shader that draws layer of texture array on sprite card"""
+    global _array_sprite_shader
+    if _array_sprite_shader is None:
+        _array_sprite_shader = Shader.make(
+            Shader.SL_GLSL, ARRAY_VERTEX_SHADER, ARRAY_FRAGMENT_SHADER
+        )
+    return _array_sprite_shader
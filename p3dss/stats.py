@@ -0,0 +1,112 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from panda3d.core import PStatCollector
+import logging
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class FrameStats:
+    """Counters of playback work done by scheduler"""
+
+    # Active nodes, whose playback has been advanced
+    nodes_advanced: int = 0
+    # Sprite switches done via set_tex_offset()
+    tex_offset_calls: int = 0
+    # Time spent inside scheduler's update, in seconds
+    tick_time: float = 0.0
+    # Amount of play() and stop() calls, per item name
+    plays: Counter = field(default_factory=Counter)
+    stops: Counter = field(default_factory=Counter)
+
+
+class AnimationStats:
+    """Opt-in instrumentation of AnimationScheduler, enabled with its
+    enable_stats() method.
+
+    Counters below are being filled during current frame and get moved into
+    last_frame (and added to totals) once scheduler's tick is over. If use_pstats
+    is enabled, each frame also gets pushed to PStats collectors under "p3dss".
+    """
+
+    def __init__(self, use_pstats: bool = False):
+        self.use_pstats = use_pstats
+        # Amount of frames recorded so far
+        self.frames = 0
+        self.last_frame = FrameStats()
+        self.totals = FrameStats()
+        self._collectors = {}
+        self.reset_frame()
+
+    def reset_frame(self):
+        """Reset counters of current frame"""
+        self.nodes_advanced = 0
+        self.tex_offset_calls = 0
+        self.tick_time = 0.0
+        self.plays = Counter()
+        self.stops = Counter()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.frames = 0
+        self.last_frame = FrameStats()
+        self.totals = FrameStats()
+        self.reset_frame()
+
+    def end_frame(self):
+        """Store counters of current frame and start new one"""
+        frame = FrameStats(
+            self.nodes_advanced,
+            self.tex_offset_calls,
+            self.tick_time,
+            self.plays,
+            self.stops,
+        )
+        self.last_frame = frame
+        self.frames += 1
+
+        totals = self.totals
+        totals.nodes_advanced += frame.nodes_advanced
+        totals.tex_offset_calls += frame.tex_offset_calls
+        totals.tick_time += frame.tick_time
+        totals.plays.update(frame.plays)
+        totals.stops.update(frame.stops)
+
+        if self.use_pstats:
+            self._push_pstats(frame)
+
+        self.reset_frame()
+
+    def _get_collector(self, name: str) -> PStatCollector:
+        collector = self._collectors.get(name)
+        if collector is None:
+            collector = PStatCollector(f"p3dss:{name}")
+            self._collectors[name] = collector
+        return collector
+
+    def get_tick_collector(self) -> PStatCollector:
+        """Get PStats collector that measures time of scheduler's tick"""
+        return self._get_collector("Animation tick")
+
+    def _push_pstats(self, frame: FrameStats):
+        self._get_collector("Nodes advanced").set_level(frame.nodes_advanced)
+        self._get_collector("Tex offset calls").set_level(frame.tex_offset_calls)
+        # Levels stay the same till changed, thus items that didnt get played
+        # this frame need to be reset to zero explicitly
+        for name in self.totals.plays:
+            self._get_collector(f"Plays:{name}").set_level(frame.plays[name])
+        for name in self.totals.stops:
+            self._get_collector(f"Stops:{name}").set_level(frame.stops[name])
+
+    def get_average(self) -> FrameStats:
+        """Get average counters of recorded frames"""
+        frames = self.frames or 1
+        totals = self.totals
+        return FrameStats(
+            totals.nodes_advanced / frames,
+            totals.tex_offset_calls / frames,
+            totals.tick_time / frames,
+            Counter({name: amount / frames for name, amount in totals.plays.items()}),
+            Counter({name: amount / frames for name, amount in totals.stops.items()}),
+        )
@@ -0,0 +1,300 @@
+import logging
+from array import array
+from functools import lru_cache
+from math import ceil
+from panda3d.core import (
+    Geom,
+    GeomNode,
+    GeomTriangles,
+    GeomVertexData,
+    GeomVertexFormat,
+    NodePath,
+    Texture,
+    Vec3,
+)
+from . import processor, types
+from .nodes import _set_wrap_mode, make_sprite_state
+
+log = logging.getLogger(__name__)
+
+# Tiles with negative sprite number are not drawn
+EMPTY_TILE = -1
+
+# Floats per vertex of tilemap chunk: position (x, y, z) and texcoord (u, v)
+_VERTEX_SIZE = 5
+_TILE_SIZE = _VERTEX_SIZE * 4
+
+
+@lru_cache(maxsize=None)
+def _get_chunk_indices(tile_count: int) -> tuple:
+    """Get index type and packed indices of two triangles per tile. Shared by
+    all chunks with the same amount of tiles"""
+    if tile_count * 4 <= 0x10000:
+        index_type, code = Geom.NT_uint16, "H"
+    else:
+        index_type, code = Geom.NT_uint32, "I"
+
+    indices = array(code)
+    for tile in range(0, tile_count * 4, 4):
+        indices.extend((tile, tile + 1, tile + 2, tile, tile + 2, tile + 3))
+    return index_type, indices.tobytes()
+
+
+class SpritesheetTilemap:
+    """Grid of static tiles from single spritesheet, drawn as few big meshes.
+
+    tiles is 2D sequence of sprite numbers (same as in get_offsets()), with rows
+    going from top to bottom. Map gets split into chunks of chunk_sizes tiles,
+    each of which is separate Geom with 4 vertices per tile - thus whole chunk
+    is one draw call and gets culled by Panda3D on its own. Tiles are placed on
+    XZ plane (same as cards of SpritesheetNode), starting from root's origin
+    and going to +X and -Z, each of them being tile_sizes units big.
+
+    Changing tile with set_tile() only rewrites 4 vertices of that tile. For big
+    maps, pass load_chunks=False and call stream() (e.g from task, with camera's
+    position) to only keep chunks around some point in memory.
+    """
+
+    def __init__(
+        self,
+        spritesheet: Texture,
+        sprite_sizes: tuple,
+        tiles: list,
+        tile_sizes: tuple = (1, 1),
+        chunk_sizes: tuple = (32, 32),
+        name: str = None,
+        parent: NodePath = None,
+        is_two_sided: bool = False,
+        is_transparent: bool = True,
+        sprite_data: types.SpritesheetData = None,
+        load_chunks: bool = True,
+    ):
+        parent = parent or NodePath()
+        self.name = name or spritesheet.get_name() or "SpritesheetTilemap"
+        self.sprite_sizes = sprite_sizes
+        self.tile_sizes = tuple(tile_sizes)
+        self.chunk_sizes = tuple(chunk_sizes)
+
+        sprite_data = sprite_data or processor.get_offsets(spritesheet, sprite_sizes)
+        # Sprite numbers of all tiles, as list of rows. Dont modify it directly -
+        # use set_tile() instead, or changes wont be visible on loaded chunks
+        self.tiles = [[int(sprite) for sprite in row] for row in tiles]
+        self.rows = len(self.tiles)
+        self.columns = len(self.tiles[0]) if self.tiles else 0
+        if any(len(row) != self.columns for row in self.tiles):
+            raise ValueError("All rows of tilemap must have the same length")
+
+        self.chunk_columns = ceil(self.columns / self.chunk_sizes[0])
+        self.chunk_rows = ceil(self.rows / self.chunk_sizes[1])
+
+        # Position and texcoords of each sprite's quad, relative to tile's top
+        # left corner. None for sprites with nothing to draw
+        self._quads = self._make_quads(sprite_data)
+
+        _set_wrap_mode(spritesheet)
+        self.state = make_sprite_state(spritesheet, is_two_sided, is_transparent)
+        self.root = parent.attach_new_node(self.name)
+        # Loaded chunks, mapped to (chunk column, chunk row)
+        self.chunks = {}
+
+        if load_chunks:
+            self.load_all()
+
+    def _make_quads(self, sprite_data: types.SpritesheetData) -> list:
+        width, height = self.tile_sizes
+        quads = []
+        for num, (u, v) in enumerate(sprite_data.offsets):
+            scale = sprite_data.scales[num] if sprite_data.scales else None
+            scale = scale or sprite_data.step_sizes
+            if sprite_data.frames:
+                left, right, bottom, top = sprite_data.frames[num]
+            else:
+                left, right, bottom, top = 0, 1, 0, 1
+
+            if right <= left or top <= bottom or not scale[0] or not scale[1]:
+                # Fully transparent trimmed sprite, or sprite from other page
+                quads.append(None)
+                continue
+
+            quads.append(
+                (
+                    left * width,
+                    right * width,
+                    (bottom - 1) * height,
+                    (top - 1) * height,
+                    u,
+                    u + scale[0],
+                    v,
+                    v + scale[1],
+                )
+            )
+        return quads
+
+    def _get_tile_vertices(self, column: int, row: int, sprite: int) -> tuple:
+        """Get floats of tile's vertices, in order they are stored in chunk"""
+        x = column * self.tile_sizes[0]
+        z = -row * self.tile_sizes[1]
+        quad = self._quads[sprite] if sprite >= 0 else None
+        if quad is None:
+            # Degenerate quad - keeps tile's place in vertex data, but draws
+            # nothing
+            return (x, 0.0, z, 0.0, 0.0) * 4
+
+        left, right, bottom, top, u0, u1, v0, v1 = quad
+        # fmt: off
+        return (
+            x + left, 0.0, z + bottom, u0, v0,
+            x + right, 0.0, z + bottom, u1, v0,
+            x + right, 0.0, z + top, u1, v1,
+            x + left, 0.0, z + top, u0, v1,
+        )
+        # fmt: on
+
+    def _get_chunk_ranges(self, chunk_x: int, chunk_y: int) -> tuple:
+        """Get ranges of columns and rows, covered by provided chunk"""
+        width, height = self.chunk_sizes
+        return (
+            range(chunk_x * width, min((chunk_x + 1) * width, self.columns)),
+            range(chunk_y * height, min((chunk_y + 1) * height, self.rows)),
+        )
+
+    def load_chunk(self, chunk_x: int, chunk_y: int) -> NodePath:
+        """Build mesh of provided chunk, if its not loaded yet"""
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            return chunk
+        if not (0 <= chunk_x < self.chunk_columns and 0 <= chunk_y < self.chunk_rows):
+            raise IndexError(f"{self.name} has no chunk {key}")
+
+        columns, rows = self._get_chunk_ranges(chunk_x, chunk_y)
+        tile_count = len(columns) * len(rows)
+        data = array("f")
+        for row in rows:
+            line = self.tiles[row]
+            for column in columns:
+                data.extend(self._get_tile_vertices(column, row, line[column]))
+
+        # Filling vertex and index data in bulk, rather than row by row with
+        # writers - this is way faster for thousands of tiles
+        vertex_data = GeomVertexData(
+            self.name, GeomVertexFormat.get_v3t2(), Geom.UH_static
+        )
+        vertex_data.unclean_set_num_rows(tile_count * 4)
+        memoryview(vertex_data.modify_array(0)).cast("B")[:] = data.tobytes()
+
+        index_type, indices = _get_chunk_indices(tile_count)
+        triangles = GeomTriangles(Geom.UH_static)
+        triangles.set_index_type(index_type)
+        index_data = triangles.modify_vertices()
+        index_data.unclean_set_num_rows(tile_count * 6)
+        memoryview(index_data).cast("B")[:] = indices
+
+        geom = Geom(vertex_data)
+        geom.add_primitive(triangles)
+        node = GeomNode(f"{self.name}_{chunk_x}_{chunk_y}")
+        node.add_geom(geom, self.state)
+        chunk = self.root.attach_new_node(node)
+        self.chunks[key] = chunk
+        return chunk
+
+    def unload_chunk(self, chunk_x: int, chunk_y: int):
+        """Remove mesh of provided chunk. Its tiles are kept and will be used
+        once chunk gets loaded again"""
+        chunk = self.chunks.pop((chunk_x, chunk_y), None)
+        if chunk is not None:
+            chunk.remove_node()
+
+    def load_all(self):
+        """Load all chunks of tilemap"""
+        for chunk_y in range(self.chunk_rows):
+            for chunk_x in range(self.chunk_columns):
+                self.load_chunk(chunk_x, chunk_y)
+        log.debug("Loaded %s chunks of %s", len(self.chunks), self.name)
+
+    def unload_all(self):
+        """Unload all chunks of tilemap"""
+        for key in tuple(self.chunks):
+            self.unload_chunk(*key)
+
+    def stream(self, position: Vec3, radius: float, max_loads: int = None) -> int:
+        """Load chunks that are closer than radius to provided position (along
+        both axes, relatively to root) and unload the rest. If max_loads is set,
+        only that many of missing chunks get loaded (nearest first), to spread
+        the work across multiple frames. Returns amount of loaded chunks"""
+        chunk_width = self.chunk_sizes[0] * self.tile_sizes[0]
+        chunk_height = self.chunk_sizes[1] * self.tile_sizes[1]
+        # Rows go down, along -Z
+        x, y = position[0], -position[2]
+
+        first_x = max(0, int((x - radius) // chunk_width))
+        last_x = min(self.chunk_columns - 1, int((x + radius) // chunk_width))
+        first_y = max(0, int((y - radius) // chunk_height))
+        last_y = min(self.chunk_rows - 1, int((y + radius) // chunk_height))
+        wanted = {
+            (chunk_x, chunk_y)
+            for chunk_x in range(first_x, last_x + 1)
+            for chunk_y in range(first_y, last_y + 1)
+        }
+
+        for key in tuple(self.chunks):
+            if key not in wanted:
+                self.unload_chunk(*key)
+
+        missing = sorted(
+            (key for key in wanted if key not in self.chunks),
+            key=lambda key: (
+                ((key[0] + 0.5) * chunk_width - x) ** 2
+                + ((key[1] + 0.5) * chunk_height - y) ** 2
+            ),
+        )
+        if max_loads is not None:
+            missing = missing[:max_loads]
+        for key in missing:
+            self.load_chunk(*key)
+
+        return len(missing)
+
+    def get_tile(self, column: int, row: int) -> int:
+        return self.tiles[row][column]
+
+    def set_tile(self, column: int, row: int, sprite: int):
+        """Change sprite of provided tile"""
+        self.set_tiles(((column, row, sprite),))
+
+    def set_tiles(self, changes):
+        """Change sprites of multiple tiles at once. Changes are (column, row,
+        sprite) tuples. Vertex data of each affected chunk is only fetched once"""
+        chunk_width, chunk_height = self.chunk_sizes
+        views = {}
+        for column, row, sprite in changes:
+            if not (0 <= column < self.columns and 0 <= row < self.rows):
+                raise IndexError(f"{self.name} has no tile {(column, row)}")
+            if sprite >= len(self._quads):
+                raise IndexError(f"{self.name} has no sprite {sprite}")
+            self.tiles[row][column] = sprite
+
+            key = (column // chunk_width, row // chunk_height)
+            view = views.get(key)
+            if view is None:
+                chunk = self.chunks.get(key)
+                if chunk is None:
+                    # Will be used once chunk gets loaded
+                    continue
+                # Geom and vertex data arent shared, thus this doesnt copy them
+                vertex_data = chunk.node().modify_geom(0).modify_vertex_data()
+                view = memoryview(vertex_data.modify_array(0)).cast("B").cast("f")
+                views[key] = view
+
+            columns, rows = self._get_chunk_ranges(*key)
+            start = (
+                (row - rows.start) * len(columns) + column - columns.start
+            ) * _TILE_SIZE
+            view[start : start + _TILE_SIZE] = array(
+                "f", self._get_tile_vertices(column, row, sprite)
+            )
+
+    def destroy(self):
+        """Remove all chunks and root node of tilemap"""
+        self.chunks = {}
+        self.root.remove_node()
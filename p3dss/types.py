@@ -5,10 +5,30 @@ import logging
 
 log = logging.getLogger(__name__)
 
+# If scales are set, they hold texture scale of each sprite, overriding
+# step_sizes. Used for sheets with sprites of different sizes, such as atlases.
+# If frames are set, they hold (left, right, bottom, top) part of node's card,
+# covered by each sprite, as fractions from 0 to 1. Used for trimmed sprites
 SpritesheetData = namedtuple(
-    "SpritesheetData", ["spritesheet", "offsets", "step_sizes"]
+    "SpritesheetData",
+    ["spritesheet", "offsets", "step_sizes", "scales", "frames"],
+    defaults=(None, None),
 )
 
+# Sprites of spritesheet with duplicates removed. "sprites" hold sprite of each
+# cell (thus can be indexed with SpritesheetItem.sprites, same as result of
+# get_textures()), but cells with the same content share the same object.
+# "unique" hold these shared objects, and "index_map" - index of unique sprite
+# used by each cell
+UniqueSprites = namedtuple("UniqueSprites", ["sprites", "unique", "index_map"])
+
+# Non-transparent area of sprite, in pixels from its top left corner
+TrimRect = namedtuple("TrimRect", ["x", "y", "width", "height"])
+
+# Estimated video memory of textures, in bytes. "full" is the amount they would
+# take as uncompressed RGBA, "actual" - with formats they have been given
+TextureMemory = namedtuple("TextureMemory", ["full", "actual"])
+
 
 @dataclass(frozen=True)
 class SpritesheetItem:
@@ -27,6 +47,42 @@ class SpritesheetItem:
     # This specifies if we should reset to default item once this one is over
     # You probably shouldnt use it with single-sprite without length, lol
     reset_on_complete: bool = False
+    # Time each sprite is shown for, overriding playback_speed. Must have the
+    # same length as sprites. Not supported by shader mode
+    frame_durations: tuple = None
+
+    def __post_init__(self):
+        if self.frame_durations is not None and len(self.frame_durations) != len(
+            self.sprites
+        ):
+            raise ValueError(
+                f"{self.name} has {len(self.sprites)} sprites, but "
+                f"{len(self.frame_durations)} frame durations"
+            )
+
+    def get_frame_duration(self, sequence_item: int) -> float:
+        """Get time sprite with provided number in sequence is shown for"""
+        if self.frame_durations is None:
+            return self.playback_speed
+        return self.frame_durations[sequence_item]
+
+    def get_duration(self) -> float:
+        """Get time it takes to play whole sequence once"""
+        if self.frame_durations is None:
+            return self.playback_speed * len(self.sprites)
+        return sum(self.frame_durations)
+
+
+class TimingMode(Enum):
+    """Ways scheduler can advance playback of nodes"""
+
+    # Sprite is switched at most once per update, and time that has been
+    # overshot is lost. Thus long frames make animations slow down
+    frame = 0
+    # Sprites are switched according to time that has passed, as many times per
+    # update as needed. Keeps animations in sync with game time, even if they
+    # are updated less often than each frame
+    elapsed = 1
 
 
 class PlaybackState(Enum):
@@ -35,3 +91,19 @@ class PlaybackState(Enum):
     stop = 0
     play = 1
     pause = 2
+
+
+class TextureFormat(Enum):
+    """Formats of textures, made out of cut sprites"""
+
+    # Same amount of channels and precision as source image
+    full = 0
+    # Channels that arent used by image (alpha that is always opaque, color of
+    # grayscale images) are dropped. Lossless
+    auto = 1
+    # Same as auto, but colored textures get 16-bit formats: RGBA4, RGB5_A1
+    # (if alpha is either opaque or transparent) or RGB5. Lossy
+    reduced = 2
+    # DXT1 (DXT5 if alpha has values between opaque and transparent) block
+    # compression. Lossy, and needs sprite sizes to be multiples of 4
+    compressed = 3
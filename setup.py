@@ -18,4 +18,5 @@ setup(
     classifiers=["Programming Language :: Python :: 3"],
     packages=find_packages(),
     install_requires=["panda3d>=1.10"],
+    extras_require={"numpy": ["numpy"]},
     )
@@ -0,0 +1,48 @@
+from os.path import abspath, dirname, join
+
+from panda3d.core import load_prc_file_data
+import pytest
+
+# Tests run without opening window
+load_prc_file_data("", "window-type none\naudio-library-name null")
+
+SHEET = join(
+    dirname(abspath(__file__)), "..", "example", "media", "32x32-bat-sprite.png"
+)
+SPRITE_SIZES = (32, 32)
+
+
+@pytest.fixture(scope="session")
+def showbase():
+    from direct.showbase.ShowBase import ShowBase
+
+    base = ShowBase()
+    yield base
+    base.destroy()
+
+
+@pytest.fixture(scope="session")
+def spritesheet(showbase):
+    """4x4 sheet of 32x32 sprites"""
+    return showbase.loader.load_texture(SHEET)
+
+
+@pytest.fixture
+def shader_support(monkeypatch):
+    """Make shader mode available, even though there is no window. Shaders
+    wont be rendered, but python side of shader mode can be tested"""
+    import p3dss
+
+    monkeypatch.setattr(p3dss.shaders, "is_supported", lambda: True)
+
+
+@pytest.fixture
+def clock(showbase):
+    """Global clock, whose frame time can be set by tests"""
+    from panda3d.core import ClockObject
+
+    clock = ClockObject.get_global_clock()
+    mode = clock.get_mode()
+    clock.set_mode(ClockObject.M_slave)
+    yield clock
+    clock.set_mode(mode)
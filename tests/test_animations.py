@@ -0,0 +1,76 @@
+import p3dss
+from conftest import SPRITE_SIZES
+
+ITEMS = [
+    p3dss.SpritesheetItem("idle", (0, 1), loop=True),
+    p3dss.SpritesheetItem("walk", (2, 3, 4), loop=True),
+]
+
+
+def make_node(spritesheet, **kwargs):
+    return p3dss.SpritesheetNode(
+        spritesheet, SPRITE_SIZES, scheduler=p3dss.AnimationScheduler(), **kwargs
+    )
+
+
+def test_play_by_id(spritesheet):
+    animation_set = p3dss.AnimationSet(ITEMS)
+    node = make_node(spritesheet, animation_set=animation_set)
+    walk = animation_set.get_id("walk")
+
+    node.play(walk)
+    assert node.active_item is ITEMS[1]
+    assert node.current_item == "walk"
+    assert node in node.scheduler.active
+
+    node.frame_time_left = 0.05
+    node.play(walk)
+    # Already playing, thus not restarted
+    assert node.frame_time_left == 0.05
+    node.play(walk, ignore_if_current=False)
+    assert node.frame_time_left == ITEMS[1].playback_speed
+
+    node.play(animation_set.get_id("idle"))
+    assert node.active_item is ITEMS[0]
+    node.destroy()
+
+
+def test_play_by_id_skips_items_table(spritesheet):
+    animation_set = p3dss.AnimationSet(ITEMS)
+    node = make_node(spritesheet, animation_set=animation_set, items={})
+    node.play("walk")
+    assert node.active_item is None
+    node.play(1)
+    assert node.active_item is ITEMS[1]
+    node.destroy()
+
+
+def test_play_unknown_id(spritesheet):
+    node = make_node(spritesheet, animation_set=p3dss.AnimationSet(ITEMS))
+    node.play(5)
+    node.play(-1)
+    assert node.active_item is None
+    assert node.playing == p3dss.PlaybackState.stop
+
+    node_without_set = make_node(spritesheet)
+    node_without_set.play(0)
+    assert node_without_set.active_item is None
+    node.destroy()
+    node_without_set.destroy()
+
+
+def test_shader_checks_shared_items(spritesheet, shader_support):
+    long_item = p3dss.SpritesheetItem("long", tuple(range(16)) * 5, loop=True)
+    timed_item = p3dss.SpritesheetItem("timed", (0, 1), frame_durations=(0.1, 0.2))
+    animation_set = p3dss.AnimationSet([*ITEMS, long_item, timed_item])
+    node = make_node(spritesheet, use_shader=True, animation_set=animation_set)
+    assert node.use_shader
+
+    for item in ("long", animation_set.get_id("timed")):
+        node.play(item)
+        assert node.active_item is None
+        assert node.playing == p3dss.PlaybackState.stop
+
+    node.play("walk")
+    assert node.active_item is ITEMS[1]
+    node.destroy()
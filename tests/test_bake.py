@@ -0,0 +1,80 @@
+import p3dss
+from conftest import SPRITE_SIZES
+from panda3d.core import GeomVertexReader, NodePath
+
+
+def get_uv_range(root: NodePath) -> tuple:
+    """Get min and max texcoords of all geoms under provided node"""
+    uvs = []
+    for node_path in root.find_all_matches("**/+GeomNode"):
+        node = node_path.node()
+        for num in range(node.get_num_geoms()):
+            reader = GeomVertexReader(node.get_geom(num).get_vertex_data(), "texcoord")
+            while not reader.is_at_end():
+                uvs.append(tuple(reader.get_data2()))
+    return min(uvs), max(uvs)
+
+
+def make_node(spritesheet, parent, scheduler):
+    node = p3dss.SpritesheetNode(
+        spritesheet, SPRITE_SIZES, parent=parent, scheduler=scheduler
+    )
+    node.add_item(p3dss.SpritesheetItem("single", (5,), 0.1))
+    return node
+
+
+def test_bake_shows_single_frame_item(spritesheet):
+    scheduler = p3dss.AnimationScheduler()
+    parent = NodePath("parent")
+    node = make_node(spritesheet, parent, scheduler)
+    node.play("single")
+    assert node.current_sprite == 0
+
+    group = p3dss.StaticSpriteGroup([node])
+    assert node.bake_group is group
+    assert node.current_sprite == 5
+    assert node not in scheduler.active
+
+    offset = node.offsets[5]
+    (u, v), _ = get_uv_range(group.root)
+    assert abs(u - offset[0]) < 1e-6
+    assert abs(v - offset[1]) < 1e-6
+
+    node.destroy()
+    assert group.root is None
+
+
+def test_bake_skips_items_that_reset(spritesheet):
+    scheduler = p3dss.AnimationScheduler()
+    parent = NodePath("parent")
+    node = make_node(spritesheet, parent, scheduler)
+    node.add_item(p3dss.SpritesheetItem("once", (3,), reset_on_complete=True))
+    node.add_item(p3dss.SpritesheetItem("idle", (1, 2), loop=True), set_default=True)
+    node.play("once")
+
+    group = p3dss.StaticSpriteGroup([node])
+    assert node.bake_group is None
+    assert not group.nodes
+    node.destroy()
+
+
+def test_bake_skips_paused_items_that_reset(spritesheet):
+    scheduler = p3dss.AnimationScheduler()
+    parent = NodePath("parent")
+    node = make_node(spritesheet, parent, scheduler)
+    node.add_item(p3dss.SpritesheetItem("once", (3, 4), 0.1, reset_on_complete=True))
+    node.add_item(p3dss.SpritesheetItem("idle", (1, 2), loop=True), set_default=True)
+    node.play("once")
+    scheduler.update(0.1)
+    scheduler.update(0.1)
+    # Finished, but not reset to default item yet
+    assert node.playing == p3dss.PlaybackState.pause
+    assert node.current_sprite == 4
+
+    group = p3dss.StaticSpriteGroup([node])
+    assert node.bake_group is None
+    assert not group.nodes
+
+    scheduler.update(0.1)
+    assert node.current_item == "idle"
+    node.destroy()
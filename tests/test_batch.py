@@ -0,0 +1,62 @@
+import p3dss
+import pytest
+from conftest import SPRITE_SIZES
+from panda3d.core import NodePath
+
+
+def test_empty_batch_is_hidden(spritesheet):
+    batch = p3dss.SpritesheetBatch(
+        spritesheet,
+        SPRITE_SIZES,
+        parent=NodePath("parent"),
+        scheduler=p3dss.AnimationScheduler(),
+    )
+    assert batch.node.is_hidden()
+
+    sprites = [batch.add(position=(num, 0, 0)) for num in range(3)]
+    batch.flush()
+    assert not batch.node.is_hidden()
+    assert batch.node.get_instance_count() == 3
+
+    for sprite in sprites[:2]:
+        sprite.destroy()
+    batch.flush()
+    assert not batch.node.is_hidden()
+    assert batch.count == 1
+    assert batch.get_instance_pos(0) == (2, 0, 0)
+
+    sprites[2].destroy()
+    batch.flush()
+    assert batch.count == 0
+    assert batch.node.is_hidden()
+
+    batch.add()
+    batch.flush()
+    assert not batch.node.is_hidden()
+    batch.destroy()
+
+
+def test_batch_card_matches_nodes(spritesheet):
+    scheduler = p3dss.AnimationScheduler()
+    batch = p3dss.SpritesheetBatch(
+        spritesheet, SPRITE_SIZES, parent=NodePath("parent"), scheduler=scheduler
+    )
+    node = p3dss.SpritesheetNode(spritesheet, SPRITE_SIZES, scheduler=scheduler)
+    # Same card geometry and texture state as regular nodes
+    assert batch.node.node().get_geom(0) == node.node.node().get_geom(0)
+    assert batch.node.get_texture() == spritesheet
+    assert batch.node.get_transparency()
+    node.destroy()
+    batch.destroy()
+
+
+def test_batch_rejects_trimmed_data(spritesheet):
+    sprite_data = p3dss.processor.get_trimmed_offsets(spritesheet, SPRITE_SIZES)
+    with pytest.raises(ValueError):
+        p3dss.SpritesheetBatch(
+            spritesheet,
+            SPRITE_SIZES,
+            parent=NodePath("parent"),
+            scheduler=p3dss.AnimationScheduler(),
+            sprite_data=sprite_data,
+        )
@@ -0,0 +1,99 @@
+import os
+import shutil
+
+import p3dss
+import pytest
+from conftest import SHEET, SPRITE_SIZES
+from panda3d.core import PNMImage
+
+
+def get_images(textures: list) -> list:
+    return [bytes(texture.get_ram_image()) for texture in textures]
+
+
+@pytest.fixture
+def sheet(tmp_path):
+    path = tmp_path / "sheet.png"
+    shutil.copy(SHEET, path)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return p3dss.SpriteCache(str(tmp_path / "cache"))
+
+
+def test_hit_skips_loading(showbase, sheet, cache, monkeypatch):
+    expected = cache.get_textures(sheet, SPRITE_SIZES)
+    assert len(expected) == 16
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Spritesheet has been cut on cache hit")
+
+    monkeypatch.setattr(p3dss.processor, "get_textures", fail)
+    # Breaking file without changing its size and modification time, thus it
+    # wont be rehashed, and would fail to load if loading has been attempted
+    stat = os.stat(sheet)
+    with open(sheet, "wb") as f:
+        f.write(bytes(stat.st_size))
+    os.utime(sheet, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    textures = cache.get_textures(sheet, SPRITE_SIZES)
+    assert get_images(textures) == get_images(expected)
+    assert textures[0].get_orig_file_x_size() == SPRITE_SIZES[0]
+
+
+def test_texture_and_path_share_entry(showbase, sheet, cache):
+    texture = showbase.loader.load_texture(sheet)
+    from_texture = cache.get_textures(texture, SPRITE_SIZES)
+    assert len(os.listdir(cache.directory)) == 3
+    from_path = cache.get_textures(sheet, SPRITE_SIZES, texture.get_magfilter())
+    assert get_images(from_path) == get_images(from_texture)
+    assert len(os.listdir(cache.directory)) == 3
+
+
+def test_stale_entry_is_replaced(showbase, sheet, cache):
+    old = cache.get_textures(sheet, SPRITE_SIZES)
+    old_hash = cache.sources[sheet][2]
+
+    image = PNMImage(sheet)
+    image.fill(1, 0, 0)
+    image.write(sheet)
+    os.utime(sheet, (0, 0))
+    new = cache.get_textures(sheet, SPRITE_SIZES)
+    assert get_images(new) != get_images(old)
+    assert not any(name.startswith(old_hash) for name in os.listdir(cache.directory))
+
+
+def test_eviction(showbase, sheet, cache):
+    cache.get_textures(sheet, SPRITE_SIZES)
+    size = cache.get_size()
+    cache.max_size = size * 3 // 2
+    newest = cache._get_key(
+        cache.sources[sheet][2], (64, 64), p3dss.SamplerState.FT_default
+    )
+    # Making sure entries can be told apart by modification time
+    for name in os.listdir(cache.directory):
+        os.utime(os.path.join(cache.directory, name), (0, 0))
+
+    cache.get_textures(sheet, (64, 64))
+    assert cache.get_size() <= cache.max_size
+    assert sorted(os.listdir(cache.directory)) == sorted(
+        [f"{newest}.bin", f"{newest}.json", "sources.json"]
+    )
+
+
+def test_atlas(showbase, sheet, cache, monkeypatch):
+    expected = cache.get_atlas([sheet, SHEET], names=["a", "b"], trim=True)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Atlas has been built on cache hit")
+
+    monkeypatch.setattr(p3dss.atlas, "build_atlas", fail)
+    result = cache.get_atlas([sheet, SHEET], names=["a", "b"], trim=True)
+    assert result.rects == expected.rects
+    assert result.frames == expected.frames
+    assert result.indexes == {"a": 0, "b": 1}
+    assert get_images(result.pages) == get_images(expected.pages)
+    data = result.get_sprite_data()
+    assert data.offsets == expected.get_sprite_data().offsets
+    assert data.scales == expected.get_sprite_data().scales
@@ -0,0 +1,174 @@
+import random
+
+import p3dss
+import pytest
+from conftest import SPRITE_SIZES
+
+pytest.importorskip("numpy")
+
+
+def play_sequence(spritesheet, scheduler, item, steps, dt):
+    """Get sprite shown by node after each update"""
+    node = p3dss.SpritesheetNode(spritesheet, SPRITE_SIZES, scheduler=scheduler)
+    node.add_item(item)
+    node.play(item.name)
+    shown = []
+    for _ in range(steps):
+        scheduler.update(dt)
+        shown.append(node.current_sprite)
+    node.destroy()
+    return shown
+
+
+def test_frame_timing_is_default():
+    assert p3dss.AnimationScheduler().timing is p3dss.TimingMode.frame
+    assert p3dss.VectorizedScheduler().timing is p3dss.TimingMode.frame
+
+
+def run_mixed(spritesheet, scheduler, dts, count=100, steps=200):
+    """Play random items on bunch of nodes, replaying some of them from time to
+    time. Returns final state of each node"""
+    rng = random.Random(1)
+    nodes = [
+        p3dss.SpritesheetNode(spritesheet, SPRITE_SIZES, scheduler=scheduler)
+        for _ in range(count)
+    ]
+    for node in nodes:
+        node.add_item(p3dss.SpritesheetItem("a", (1, 2, 3), loop=True))
+        node.add_item(p3dss.SpritesheetItem("b", (4, 5), playback_speed=0.05))
+        node.add_item(p3dss.SpritesheetItem("r", (6, 7), reset_on_complete=True))
+        node.add_item(
+            p3dss.SpritesheetItem(
+                "d",
+                (8, 9, 10, 11),
+                loop=True,
+                frame_durations=(0.02, 0.3, 0.05, 0.1),
+            )
+        )
+        node.set_default("a")
+        node.play(rng.choice("abrd"))
+
+    for num in range(steps):
+        scheduler.update(rng.choice(dts))
+        if num % 17 == 0:
+            for node in rng.sample(nodes, 10):
+                node.play(rng.choice("abrd"), ignore_if_current=False)
+
+    state = [(node.current_sprite, node.playing, node.current_item) for node in nodes]
+    for node in nodes:
+        node.destroy()
+    return state
+
+
+@pytest.mark.parametrize("timing", list(p3dss.TimingMode))
+@pytest.mark.parametrize("default_item", [False, True])
+def test_reset_on_complete_matches(spritesheet, timing, default_item):
+    item = p3dss.SpritesheetItem("once", (1, 2, 3), 0.1, reset_on_complete=True)
+    results = []
+    for scheduler in (
+        p3dss.AnimationScheduler(timing=timing),
+        p3dss.VectorizedScheduler(timing=timing),
+    ):
+        node = p3dss.SpritesheetNode(spritesheet, SPRITE_SIZES, scheduler=scheduler)
+        node.add_item(item)
+        node.add_item(p3dss.SpritesheetItem("idle", (8, 9), 0.1, loop=True))
+        if default_item:
+            node.set_default("idle")
+        node.play("once")
+        shown = []
+        for _ in range(8):
+            scheduler.update(0.1)
+            shown.append(node.current_sprite)
+        node.destroy()
+        results.append(shown)
+
+    assert results[0] == results[1]
+    if not default_item:
+        assert results[0][:6] == [1, 2, 3, 3, 3, 3]
+
+
+@pytest.mark.parametrize("timing", list(p3dss.TimingMode))
+@pytest.mark.parametrize("dts", [(1 / 60,), (1 / 60, 0.2, 0.5, 3.7, 1 / 20)])
+def test_matches_animation_scheduler(spritesheet, timing, dts):
+    expected = run_mixed(spritesheet, p3dss.AnimationScheduler(timing=timing), dts)
+    result = run_mixed(
+        spritesheet, p3dss.VectorizedScheduler(timing=timing, capacity=4), dts
+    )
+    assert result == expected
+
+
+def test_elapsed_catch_up(spritesheet):
+    item = p3dss.SpritesheetItem("a", tuple(range(16)), 0.07, loop=True)
+    elapsed = p3dss.TimingMode.elapsed
+    expected = play_sequence(
+        spritesheet, p3dss.AnimationScheduler(timing=elapsed), item, 50, 0.25
+    )
+    result = play_sequence(
+        spritesheet, p3dss.VectorizedScheduler(timing=elapsed), item, 50, 0.25
+    )
+    assert result == expected
+
+
+def run_stopping(spritesheet, scheduler, count=50, steps=120):
+    """Play looped items on bunch of nodes, while stopping, resuming and
+    destroying random ones. Returns sprites shown by remaining nodes"""
+    rng = random.Random(2)
+    nodes = []
+    for num in range(count):
+        node = p3dss.SpritesheetNode(spritesheet, SPRITE_SIZES, scheduler=scheduler)
+        node.add_item(
+            p3dss.SpritesheetItem("a", tuple(range(num % 5 + 2)), 0.05, loop=True)
+        )
+        node.play("a")
+        nodes.append(node)
+
+    for num in range(steps):
+        scheduler.update(1 / 30)
+        if num % 7 == 0:
+            for node in rng.sample(nodes, 5):
+                if node.playing:
+                    node.stop()
+                else:
+                    node.play("a")
+        if num % 30 == 0:
+            node = nodes.pop(rng.randrange(len(nodes)))
+            node.destroy()
+
+    state = [(node.current_sprite, node.playing) for node in nodes]
+    for node in nodes:
+        node.destroy()
+    return state
+
+
+def test_stop_and_destroy_match(spritesheet):
+    expected = run_stopping(spritesheet, p3dss.AnimationScheduler())
+    scheduler = p3dss.VectorizedScheduler(capacity=2)
+    result = run_stopping(spritesheet, scheduler)
+    assert result == expected
+    # Slots of stopped and destroyed nodes are freed
+    assert scheduler.count == 0
+    assert not scheduler.active
+    assert len(scheduler.time_left) >= 50
+
+
+@pytest.mark.parametrize(
+    "scheduler_type", [p3dss.AnimationScheduler, p3dss.VectorizedScheduler]
+)
+def test_shader_nodes_only_tracked(spritesheet, shader_support, scheduler_type):
+    scheduler = scheduler_type()
+    node = p3dss.SpritesheetNode(
+        spritesheet, SPRITE_SIZES, scheduler=scheduler, use_shader=True
+    )
+    node.add_item(p3dss.SpritesheetItem("once", (4, 5), 0.1))
+    node.play("once")
+    initial = node.offsets[node.current_sprite]
+
+    scheduler.update(0.1)
+    assert node.current_sprite == 4
+    scheduler.update(0.1)
+    assert node.current_sprite == 5
+    assert node.playing == p3dss.PlaybackState.pause
+    # Shader inputs are only set on play() and stop()
+    shown = node.node.get_shader_input("p3dss_initial")
+    assert shown.get_vector().get_xy() == initial
+    node.destroy()
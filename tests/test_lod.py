@@ -0,0 +1,73 @@
+import p3dss
+import pytest
+from conftest import SPRITE_SIZES
+from panda3d.core import Camera, NodePath, PerspectiveLens
+
+ITEM = p3dss.SpritesheetItem("walk", tuple(range(1, 9)), 0.1, loop=True)
+
+
+@pytest.fixture
+def scene():
+    root = NodePath("root")
+    camera = root.attach_new_node(Camera("camera", PerspectiveLens()))
+    return root, camera
+
+
+def make_node(spritesheet, root, scheduler, position):
+    node = p3dss.SpritesheetNode(
+        spritesheet, SPRITE_SIZES, parent=root, scheduler=scheduler, position=position
+    )
+    node.add_item(ITEM)
+    node.play("walk")
+    return node
+
+
+def test_throttled_levels_stay_ordered(spritesheet, scene):
+    root, camera = scene
+    # Nodes farther than 10 units get updated 5 times per second
+    scheduler = p3dss.LODScheduler(camera=camera, lod_levels=((10, 5),))
+    far = [make_node(spritesheet, root, scheduler, (0, 50, 0)) for _ in range(2)]
+    # Behind camera, thus frozen
+    hidden = make_node(spritesheet, root, scheduler, (0, -50, 0))
+    assert scheduler.active[hidden] == scheduler.frozen
+    assert all(scheduler.active[node] == 1 for node in far)
+
+    # Far nodes get updated on the second tick
+    for _ in range(2):
+        scheduler.update(0.1)
+    assert hidden.current_sprite == 0
+    assert all(scheduler.levels[1][node] == scheduler.time for node in far)
+
+    # Node that has been frozen since start becomes visible, while nodes at the
+    # beginning of its new level arent due yet
+    hidden.node.set_pos(0, 50, 0)
+    scheduler.update(0.1)
+    assert scheduler.active[hidden] == 1
+
+    # It receives all time that has passed since its last update right away
+    reference = p3dss.AnimationScheduler(timing=p3dss.TimingMode.elapsed)
+    expected = make_node(spritesheet, root, reference, (0, 0, 0))
+    reference.update(scheduler.time)
+    assert hidden.current_sprite == expected.current_sprite
+
+    for level in scheduler.levels[1:-1]:
+        times = list(level.values())
+        assert times == sorted(times)
+    assert scheduler.levels[1][hidden] == scheduler.time
+
+
+def test_without_camera(spritesheet, showbase):
+    # Windowless ShowBase has no base.cam
+    assert getattr(showbase, "cam", None) is None
+    root = NodePath("root")
+    scheduler = p3dss.LODScheduler(lod_levels=((10, 5),))
+    node = make_node(spritesheet, root, scheduler, (0, -50, 0))
+    assert scheduler.active[node] == 0
+
+    reference = p3dss.AnimationScheduler(timing=p3dss.TimingMode.elapsed)
+    expected = make_node(spritesheet, root, reference, (0, 0, 0))
+    # Step that doesnt land on sprite switches, to avoid rounding differences
+    for _ in range(10):
+        scheduler.update(0.045)
+        reference.update(0.045)
+        assert node.current_sprite == expected.current_sprite
@@ -0,0 +1,52 @@
+import p3dss
+from conftest import SPRITE_SIZES
+from panda3d.core import NodePath
+
+ITEMS = [
+    p3dss.SpritesheetItem("idle", (0, 1), loop=True),
+    p3dss.SpritesheetItem("walk", (2, 3, 4), loop=True),
+]
+
+
+def make_pool(spritesheet, **kwargs):
+    return p3dss.SpritesheetNodePool(
+        spritesheet,
+        SPRITE_SIZES,
+        items=ITEMS,
+        parent=NodePath("parent"),
+        scheduler=p3dss.AnimationScheduler(),
+        **kwargs,
+    )
+
+
+def test_double_release_is_ignored(spritesheet):
+    pool = make_pool(spritesheet)
+    node = pool.acquire()
+    pool.release(node)
+    pool.release(node)
+    assert pool.free == [node]
+    assert pool.stats.released == 1
+
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first is node
+    assert second is not node
+
+
+def test_release_resets_node(spritesheet):
+    pool = make_pool(spritesheet, scale=2, default_item="idle")
+    node = pool.acquire(position=(1, 2, 3), item="walk")
+    node.node.set_hpr(90, 0, 0)
+    node.set_default("walk")
+    node.frame_time_left = 0.05
+    pool.release(node)
+
+    assert node.active_item is None
+    assert node not in node.scheduler.active
+    assert node.frame_time_left == 0
+    assert node.default_item == "idle"
+
+    node = pool.acquire()
+    assert node.node.get_pos() == (0, 0, 0)
+    assert node.node.get_hpr() == (0, 0, 0)
+    assert node.node.get_scale() == (2, 2, 2)
@@ -0,0 +1,77 @@
+import p3dss
+import pytest
+from conftest import SPRITE_SIZES
+from panda3d.core import Camera, NodePath, PerspectiveLens
+
+ITEM = p3dss.SpritesheetItem("a", (1, 2, 3), 0.1, loop=True)
+
+
+def make_schedulers():
+    camera = NodePath(Camera("camera", PerspectiveLens()))
+    camera.set_pos(0, -10, 0)
+    schedulers = [
+        p3dss.AnimationScheduler(),
+        p3dss.LODScheduler(),
+        p3dss.LODScheduler(camera=camera),
+    ]
+    try:
+        schedulers.append(p3dss.VectorizedScheduler(capacity=2))
+    except p3dss.exceptions.MissingDependency:
+        pass
+    return schedulers
+
+
+def play_nodes(spritesheet, scheduler, count=3):
+    nodes = []
+    for _ in range(count):
+        node = p3dss.SpritesheetNode(
+            spritesheet, SPRITE_SIZES, parent=NodePath("parent"), scheduler=scheduler
+        )
+        node.add_item(ITEM)
+        node.play("a")
+        nodes.append(node)
+    return nodes
+
+
+@pytest.mark.parametrize("scheduler", make_schedulers(), ids=type)
+def test_destroy(spritesheet, scheduler):
+    nodes = play_nodes(spritesheet, scheduler)
+    nodes[0].destroy()
+    assert nodes[0].node.is_empty()
+    assert nodes[0] not in scheduler.nodes
+    assert nodes[0] not in scheduler.active
+
+    scheduler.update(0.1)
+    assert [node.current_sprite for node in nodes[1:]] == [1, 1]
+    for node in nodes[1:]:
+        node.destroy()
+    assert scheduler.task is None
+
+
+@pytest.mark.parametrize("scheduler", make_schedulers(), ids=type)
+def test_removed_node(spritesheet, scheduler):
+    nodes = play_nodes(spritesheet, scheduler)
+    nodes[0].node.remove_node()
+    scheduler.update(0.1)
+    assert nodes[0] not in scheduler.nodes
+    assert nodes[0] not in scheduler.active
+    assert [node.current_sprite for node in nodes[1:]] == [1, 1]
+
+    scheduler.update(0.1)
+    assert [node.current_sprite for node in nodes[1:]] == [2, 2]
+    for node in nodes[1:]:
+        node.destroy()
+
+
+def test_removed_node_keeps_task_running(showbase, spritesheet):
+    scheduler = p3dss.AnimationScheduler()
+    removed, node = play_nodes(spritesheet, scheduler, 2)
+    removed.node.remove_node()
+    # Making sure sprite changes on the first step, regardless of frame time
+    removed.frame_time_left = 0
+    for _ in range(10):
+        showbase.task_mgr.step()
+    assert removed not in scheduler.nodes
+    assert scheduler.task is not None
+    assert node in scheduler.active
+    node.destroy()
@@ -0,0 +1,72 @@
+import p3dss
+from conftest import SPRITE_SIZES
+from panda3d.core import NodePath, TextureStage
+
+LOOPED = p3dss.SpritesheetItem("looped", (1, 2, 3), 0.1, loop=True)
+ONCE = p3dss.SpritesheetItem("once", (4, 5), 0.1)
+
+
+def make_node(spritesheet, scheduler):
+    node = p3dss.SpritesheetNode(
+        spritesheet,
+        SPRITE_SIZES,
+        parent=NodePath("parent"),
+        scheduler=scheduler,
+        use_shader=True,
+    )
+    node.add_item(LOOPED)
+    node.add_item(ONCE)
+    return node
+
+
+def test_falls_back_without_shaders(spritesheet):
+    scheduler = p3dss.AnimationScheduler()
+    node = make_node(spritesheet, scheduler)
+    assert not node.use_shader
+    assert node.node.get_shader() is None
+
+    node.play("looped")
+    scheduler.update(0.1)
+    scheduler.update(0.1)
+    assert node.current_sprite == 2
+    offset = node.node.get_tex_offset(TextureStage.get_default())
+    assert offset == node.offsets[2]
+    node.destroy()
+
+
+def test_stop_keeps_shown_sprite(spritesheet, shader_support, clock):
+    scheduler = p3dss.AnimationScheduler()
+    node = make_node(spritesheet, scheduler)
+    assert node.use_shader
+
+    clock.set_frame_time(10)
+    node.play("looped")
+    # Looped items are handled by shader alone
+    assert node not in scheduler.active
+    clock.set_frame_time(10.45)
+    node.stop()
+    # 4 sprites have been shown, thus it wrapped to the first one
+    assert node.current_sprite == 1
+    shown = node.node.get_shader_input("p3dss_initial")
+    assert shown.get_vector().get_xy() == node.offsets[1]
+    node.destroy()
+
+
+def test_non_looped_item_ends(spritesheet, shader_support, clock):
+    scheduler = p3dss.AnimationScheduler()
+    node = make_node(spritesheet, scheduler)
+
+    clock.set_frame_time(10)
+    node.play("once")
+    # Non-looped items are tracked, to know when they end
+    assert node in scheduler.active
+    for _ in range(4):
+        scheduler.update(0.1)
+    assert node.playing == p3dss.PlaybackState.pause
+    assert node.current_sprite == 5
+    assert node not in scheduler.active
+
+    clock.set_frame_time(11)
+    node.stop()
+    assert node.current_sprite == 5
+    node.destroy()